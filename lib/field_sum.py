@@ -0,0 +1,34 @@
+import cmath
+import numpy as np
+
+# numba is optional: with it the field sum is compiled and runs on all cores, without it NumPy broadcasting is used
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def transmitted_power_numpy(amplitude, exponent, r):
+    '''Sums the Gaussian components of the electric field at every radius and integrates the power over the radius.\n
+    `amplitude` and `exponent` are (m, z) arrays, `r` holds the integration radii.'''
+    E = np.sum(amplitude*np.exp(exponent*r[:,None,None]**2), axis=1) # (radius, m, z) summed over m
+    return np.sum(np.abs(E)**2*r[:,None], axis=0)
+
+def transmitted_power_loops(amplitude, exponent, r):
+    '''Same as `transmitted_power_numpy()`, written as loops for numba (each z position is independent).'''
+    mm, nz = amplitude.shape
+    Tz = np.zeros(nz)
+    for z in prange(nz):
+        for rr in range(r.shape[0]):
+            E = 0j
+            for m in range(mm):
+                E += amplitude[m,z]*cmath.exp(exponent[m,z]*r[rr]**2)
+            Tz[z] += (E.real**2+E.imag**2)*r[rr]
+    return Tz
+
+if NUMBA_AVAILABLE:
+    # No fastmath: the beam curvature is infinite at z=0 and must stay IEEE-correct
+    transmitted_power = njit(parallel=True, cache=True)(transmitted_power_loops)
+else:
+    prange = range
+    transmitted_power = transmitted_power_numpy
@@ -6,6 +6,10 @@ from matplotlib.figure import Figure
 from matplotlib.ticker import FormatStrFormatter
 matplotlib.rcParams['axes.prop_cycle'] = cycler(color=['orange','#3c7ffc','magenta'])
 
+# Grid switch keyword was renamed from 'b' to 'visible' in matplotlib 3.5; checked once at import
+MPL_VERSION = tuple(int(i) for i in matplotlib.__version__.split('.')[:2])
+GRID_KWARGS = {'b': True} if MPL_VERSION[0] >= 3 and MPL_VERSION[1] < 5 else {'visible': True}
+
 class MplCanvas(FigureCanvasQTAgg):
 
     def __init__(self, parent=None, width=5, height=4, dpi=100):
@@ -14,10 +18,6 @@ class MplCanvas(FigureCanvasQTAgg):
         self.axes.set_ylabel('Amplitude')
         self.axes.set_xlabel('Position (mm)')
         self.axes.minorticks_on()
-        mpl_version = [int(i) for i in matplotlib.__version__.split('.')]
-        if mpl_version[0] >= 3 and mpl_version[1] < 5:
-            self.axes.grid(b=True, which='both', axis='both')
-        else:
-            self.axes.grid(visible=True, which='both', axis='both')
+        self.axes.grid(which='both', axis='both', **GRID_KWARGS)
         self.axes.yaxis.set_major_formatter(FormatStrFormatter('%.3f'))
         super(MplCanvas, self).__init__(self.fig)
\ No newline at end of file
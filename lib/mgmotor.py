@@ -1,6 +1,10 @@
 from PyQt5.QAxContainer import QAxWidget
 from PyQt5.QtCore import QVariant
 
+# The MG17Motor control, created by the first 'get_motor_singleton()' call
+motor_control = None
+
+
 class MG17Motor(QAxWidget):
     def __init__(self):
         super(MG17Motor, self).__init__()
@@ -8,4 +12,13 @@ class MG17Motor(QAxWidget):
     
     def configure(self, hw_serial_num):
         self.dynamicCall('SetHWSerialNum(int)', QVariant(hw_serial_num))
-        self.dynamicCall('StartCtrl()')
\ No newline at end of file
+        self.dynamicCall('StartCtrl()')
+
+
+def get_motor_singleton():
+    '''Returns the MG17Motor control, activating the COM control only on the first call.\n
+    It is a widget (ActiveX control), so it must be created and used from the GUI thread only.'''
+    global motor_control
+    if motor_control is None:
+        motor_control = MG17Motor()
+    return motor_control
@@ -1,13 +1,15 @@
-from decimal import *
-from unicodedata import decimal
+from decimal import Decimal, ROUND_UP, ROUND_HALF_UP
+import math
 import numpy as np
-import traceback
 import logging
 
+DECIMAL_PLACES = 15 # This precision is needed for the values in zscan1.py program
+PRECISION = Decimal(10) ** -DECIMAL_PLACES
+
 # Round value according to uncertainty
 def error_rounding(value, error):
-    decimal_places = 15 # This precision is needed for the values in zscan1.py program
-    precision = Decimal(10) ** -decimal_places
+    decimal_places = DECIMAL_PLACES
+    precision = PRECISION
 
     if all(item is not None for item in [value,error]):
         val_sign, val_digits, val_exp = Decimal(value).quantize(precision).as_tuple()
@@ -21,9 +23,9 @@ def error_rounding(value, error):
     #print(f'Taking {value} and {error}.')
 
     try:
-        error_mag = np.floor(error.log10())
+        error_mag = math.floor(math.log10(error))
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logging.exception("error_rounding failed")
         print(f"{value=}\n{error=}")
         return float(value), float(error), decimal_places
     
@@ -32,14 +34,14 @@ def error_rounding(value, error):
     try:
         error_amp = Decimal(float(error)*10**-(error_mag)).quantize(precision)
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logging.exception("error_rounding failed")
         print(f"{value=}\n{error=}\n{error_mag=}")
     #print(f'Error amplitude is {error_amp}.')
 
     try:
         rounded_error_amp = error_amp.quantize(0, rounding=ROUND_UP)
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logging.exception("error_rounding failed")
         print(f"{value=}\n{error=}\n{error_mag=}\n{error_amp=}")
     #print(f'Rounded error amplitude is equal to {rounded_error_amp}.')
 
@@ -53,7 +55,7 @@ def error_rounding(value, error):
             #print(f'It is less than or equal to 10% of the original value.')
     
     except Exception as e:
-        logging.error(traceback.format_exc())
+        logging.exception("error_rounding failed")
         print(f"{value=}\n{error=}\n{error_mag=}\n{error_amp=}\n{rounded_error_amp=}")
 
     _, round_err_dig, round_err_exp = rounded_error_amp.as_tuple()
@@ -61,8 +63,8 @@ def error_rounding(value, error):
             round_err_dig = round_err_dig + (0,)
     
     # Check if rounding didn't cause change in order of magnitude
-    error_amp_mag = np.floor(error_amp.log10())
-    rounded_error_amp_mag = np.floor(rounded_error_amp.log10())
+    error_amp_mag = math.floor(math.log10(error_amp))
+    rounded_error_amp_mag = math.floor(math.log10(rounded_error_amp))
 
     if rounded_error_amp_mag != error_amp_mag:
         #print(f"{rounded_error_amp_mag = }")
@@ -87,4 +89,4 @@ def error_rounding(value, error):
 
     _,_, exp = rounded_value.as_tuple()
 
-    return float(rounded_value), float(rounded_error), np.abs(exp)
\ No newline at end of file
+    return float(rounded_value), float(rounded_error), np.abs(exp)
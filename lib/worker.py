@@ -27,11 +27,15 @@ class WorkerSignals(QObject):
     progress
         int indicating % progress
 
+    data_ready
+        object data produced at each step of processing (e.g. one measured datapoint)
+
     '''
     finished = pyqtSignal()
     error = pyqtSignal(tuple)
     result = pyqtSignal(object)
     progress = pyqtSignal(int)
+    data_ready = pyqtSignal(object)
     #status = pyqtSignal(str)
 
 
@@ -60,6 +64,7 @@ class Worker(QRunnable):
 
         # Add the callback to our kwargs
         self.kwargs['progress_callback'] = self.signals.progress
+        self.kwargs['data_ready_callback'] = self.signals.data_ready
         #self.kwargs['status_callback'] = self.signals.status
 
     @pyqtSlot()
@@ -1,12 +1,15 @@
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
+import importlib
 import json
-from math import factorial
 import nidaqmx
 from nidaqmx import stream_readers
 from nidaqmx.constants import AcquisitionType, Edge
 import numpy as np
 from numpy.typing import NDArray
 from lmfit import Minimizer, Parameters#, fit_report
+import threading
 import time
 import os
 import re
@@ -20,14 +23,15 @@ matplotlib.rcParams.update({'font.size': 7})
 
 from lib.cursors import BlittedCursor, SnappingCursor
 from lib.figure import MplCanvas
+from lib.field_sum import transmitted_power
 from lib.worker import Worker
 from lib.scientific_rounding import error_rounding
-from lib.mgmotor import MG17Motor
+from lib.mgmotor import get_motor_singleton
 
 from PyQt5 import QtWidgets, uic, QtGui, QtCore
-from PyQt5.QtGui import QPalette, QColor
+from PyQt5.QtGui import QPalette, QColor, QTextCursor
 from PyQt5.QtWidgets import QFileDialog, QMessageBox, QSlider
-from PyQt5.QtCore import QObject, QThreadPool, QTimer
+from PyQt5.QtCore import QObject, QThreadPool, QTimer, Qt, QSignalBlocker
 
 from scipy.signal import medfilt
 from scipy.special import hyp2f1, lambertw
@@ -36,26 +40,69 @@ import sys
 
 from typing import Tuple
 
+logger = logging.getLogger(__name__)
+
 # CONSTANTS
+BASE_DIR = os.path.abspath(os.path.dirname(__file__)) # program files (window.ui, solvents.json, lib/) are looked up here
+SOLVENTS_FILE = os.path.join(BASE_DIR, 'solvents.json')
 SILICA_BETA = 0
 N_COMPONENTS = 8 # number of electric field components (for Gaussian decomposition)
 INTEGRATION_STEPS = 30 # accuracy of integration infinitesimal element, dx.
 CUVETTE_PATH_LENGTH = 0.001 # [m] path length inside cuvette
 SOLVENT_T_SLIDER_MAX = 1
 MAX_DPHI0 = 3.142 # maximum DeltaPhi0 for silica (for sliders)
+# Custom-value check box and the field it unlocks, for each 'enable_custom()' case that only toggles readOnly
+CUSTOM_READONLY_FIELDS = {'ApertureDiameter': ("customApertureDiameter_checkBox", "apertureDiameter_doubleSpinBox"),
+                          'ApertureDistance': ("customApertureToFocusDistance_checkBox", "apertureToFocusDistance_doubleSpinBox"),
+                          'SilicaThickness': ("customSilicaThickness_checkBox", "silicaThickness_dataFittingTab_doubleSpinBox"),
+                          'Wavelength': ("customWavelength_checkBox", "wavelength_dataFittingTab_doubleSpinBox"),
+                          'ZscanRange': ("customZscanRange_checkBox", "zscanRange_doubleSpinBox"),
+                          'Concentration': ("customConcentration_checkBox", "concentration_dataFittingTab_doubleSpinBox")}
+# Absorption check box and the model widgets it hides, for each 'toggle_absorption_model()' case
+ABSORPTION_MODEL_FIELDS = {'Solvent': ("solventOA_isAbsorption_checkBox", ("solventOA_absorptionModel_label", "solventOA_absorptionModel_comboBox", "solventOA_fixROI_checkBox")),
+                           'Sample': ("sampleOA_isAbsorption_checkBox", ("sampleOA_absorptionModel_label", "sampleOA_absorptionModel_comboBox", "sampleOA_fixROI_checkBox"))}
+# Absorption check box, model combo box and the saturation widgets it shows, for each 'toggle_saturation_model()' case
+SATURATION_MODEL_FIELDS = {'Solvent': ("solventOA_isAbsorption_checkBox", "solventOA_absorptionModel_comboBox", ("solventOA_saturationModel_label", "solventOA_saturationModel_comboBox")),
+                           'Sample': ("sampleOA_isAbsorption_checkBox", "sampleOA_absorptionModel_comboBox", ("sampleOA_saturationModel_label", "sampleOA_saturationModel_comboBox"))}
+SATURATION_MODELS = frozenset(("SA", "2PA+SA")) #, "RSA"
+# Message box per 'showdialog()' message type
+MESSAGE_BOXES = {"Error": QMessageBox.critical, "Warning": QMessageBox.warning, "Info": QMessageBox.information}
+# Correct header must include these and a beacon at the end in the form of "SNo" substring (whole words, compiled once)
+REQUIRED_HEADER_PATTERNS = [(match, re.compile(r"\b%s\b" % match)) for match in ["Concentration","Wavelength","Starting pos","Ending pos", "SNo"]]
+OPTIONAL_HEADER_PATTERNS = [(match, re.compile(r"\b%s\b" % match)) for match in ["Silica thickness"]]
+# Numbers read from the header lines by 'read_header_params()'
+NONZERO_NUMBER_PATTERN = re.compile(r'(([1-9][0-9]*\.?[0-9]*)|(\.[0-9]+))([Ee][+-]?[0-9]+)?')
+NUMBER_PATTERN = re.compile(r'(([0-9][0-9]*\.?[0-9]*)|(\.[0-9]+))([Ee][+-]?[0-9]+)?')
+PERCENT_PATTERN = re.compile(r'(([0-9][0-9]*\.?[0-9]*\s*%)|(\.[0-9]()\s*%+))([Ee][+-]?[0-9]()\s*%+)?')
+HOMING_POLL_INTERVAL = 0.05 # [s] how often 'movehome()' checks if homing has completed
+ACQUISITION_TIMEOUT = 10 # seconds to wait for the samples of one step (as nidaqmx read default)
+ACQUISITION_POLL_INTERVAL = 0.05 # [s] how often the wait for the samples of a step checks for a stop request
+MAX_PENDING_DATAPOINTS = 2 # how many measured datapoints may wait for display before the acquisition pauses
+MEASUREMENT_REDRAW_MS = 33 # [ms] datapoints arriving within this time are drawn together (~30 fps)
+RMS_TEXT = "RMS noise = {:.3f}%" # label of the Reference channel noise on the absolute measurement chart
+FIT_DEBOUNCE_MS = 30 # [ms] slider ticks within this time are coalesced into one manual fit
+
+@contextmanager
+def frozen_updates(widget):
+    '''Disables the repainting of `widget` (and its children) for the `with` block, so Qt redraws them once.'''
+    widget.setUpdatesEnabled(False)
+    try:
+        yield widget
+    finally:
+        widget.setUpdatesEnabled(True)
 
 class Window(QtWidgets.QMainWindow):
 
 # INITIALIZATION
     def __init__(self):
         super(Window, self).__init__()
-        uic.loadUi(os.path.join(os.path.dirname(__file__), './window.ui'), self)
+        self.load_ui(os.path.join(BASE_DIR, 'window.ui'))
         
         # Additions to UI design
         #self.path = os.path.join("C:/z-scan/_wyniki/") # default main directory for z-scan data
-        self.path = os.path.join(os.path.dirname(__file__),'data')
-        self.mainDirectory_lineEdit.setText(self.path.replace("/","\\"))
-        self.dataDirectory_lineEdit.setText(self.path.replace("/","\\"))
+        self.path = os.path.join(BASE_DIR,'data')
+        self.mainDirectory_lineEdit.setText(os.path.normpath(self.path))
+        self.dataDirectory_lineEdit.setText(os.path.normpath(self.path))
         
         self.solventOA_absorptionModel_label.setVisible(False)
         self.solventOA_absorptionModel_comboBox.setVisible(False)
@@ -68,18 +115,56 @@ class Window(QtWidgets.QMainWindow):
         self.states()
         self.additional_variables()
         self.additional_objects()
+        # Signals are wired once the event loop runs, so the window paints first (it stays disabled until then)
+        self.setEnabled(False)
+        QTimer.singleShot(0, self.connect_triggers)
+
+        # Load the motor driver while the user looks at the window (see 'preload_motor_driver()')
+        self.io_threadpool.start(Worker(self.preload_motor_driver))
+        
+        # SHOW THE APP WINDOW
+        self.show()
+
+    def load_ui(self, ui_file):
+        '''Builds the widgets from the Python translation of 'ui_file' kept in lib/ (e.g. lib/window_gui.py).\n
+        The translation is regenerated only when the .ui file is newer, so an unchanged design skips XML parsing at startup.
+        If it cannot be written or imported, the .ui file is loaded directly.'''
+        ui_name = os.path.splitext(os.path.basename(ui_file))[0]+"_gui"
+        gui_file = os.path.join(BASE_DIR, 'lib', ui_name+".py")
+        try:
+            if not os.path.exists(gui_file) or os.path.getmtime(gui_file) < os.path.getmtime(ui_file):
+                with open(gui_file+".tmp", 'w', encoding='utf-8') as f:
+                    uic.compileUi(ui_file, f)
+                os.replace(gui_file+".tmp", gui_file) # never leave a half-written module behind
+            module = importlib.import_module("lib."+ui_name)
+        except (OSError, ImportError):
+            logger.exception("Compiled UI not available, loading %s directly", ui_file)
+            uic.loadUi(ui_file, self)
+            return
+        
+        ui = next(cls for name, cls in vars(module).items() if name.startswith("Ui_"))()
+        ui.setupUi(self)
+        self.__dict__.update(vars(ui)) # widgets become attributes of the window, as with 'uic.loadUi()'
+
+    def connect_triggers(self):
         self.value_change_triggers()
         self.slider_triggers()
         self.clicker_triggers()
         self.timer_triggers()
-        
-        # SHOW THE APP WINDOW
-        self.show()
+        self.setEnabled(True)
 
     def timing_and_threading(self):
         self.timer=QTimer()
+        self.measurement_redraw_timer = QTimer(self)
+        self.measurement_redraw_timer.setSingleShot(True)
+        self.measurement_redraw_timer.timeout.connect(self.redraw_measurement_charts)
         self.threadpool = QThreadPool()
-        print(f"Multithreading with maximum {self.threadpool.maxThreadCount()} threads")
+        # Motor moves and the scan are started by 'start_motor_job()', which runs only one of them at a time
+        self.motor_busy = threading.Lock()
+        # Library loading and file writing run in a separate pool, not queued behind a running scan
+        self.io_threadpool = QThreadPool()
+        self.io_threadpool.setMaxThreadCount(2)
+        print(f"Multithreading with maximum {self.threadpool.maxThreadCount()}+{self.io_threadpool.maxThreadCount()} threads")
 
     def states(self):
         self.clearing = False
@@ -87,6 +172,7 @@ class Window(QtWidgets.QMainWindow):
         self.experiment_stopped = False
         self.initialized = False
         self.initializing = False # variable for watching if initialize method has been called
+        self.motor_connected = False # set once the motor object has been created in 'motor_detection_and_homing()'
         self.running = False # Variable for watching if run method has been called
         self.silicaCA_fittingLine_drawn = False
         self.silica_autofit_done = False
@@ -110,10 +196,13 @@ class Window(QtWidgets.QMainWindow):
 
         self.header_correct = False
         self.rms_value = 0.0 # RMS of Reference signal
+        self.scan_steps = self.stepsScan_spinBox.value() # number of steps of the current scan (see 'set_to_start()')
+        self.data_count = 0 # number of points measured in the current scan (write cursor of the 'self.data' buffers)
+        self.raw_log_lines = [] # lines of the raw log in acquisition order (see 'create_raw_log_line()')
 
     def additional_objects(self):
         # Motor control
-        self.ocx = MG17Motor()
+        self.ocx = get_motor_singleton() # the ActiveX control is activated once and reused
         ocx_layout = self.mg17motor_control_vlayout
         ocx_layout.addWidget(self.ocx)
         
@@ -124,16 +213,25 @@ class Window(QtWidgets.QMainWindow):
         # Solvents list
         self.load_solvents()
         # Others
+        self.fit_timers = {} # single-shot timers per (ftype, stype), see 'fit_manually_debounced()'
+        self.noise_filter_requests = {} # number of the latest filtering request per (ftype, stype), see 'reduce_noise_in_data()'
+        # Extra signal wiring for functions run by 'thread_it()' or 'start_motor_job()', keyed by the unbound method
+        self.thread_signal_wirers = {MotorPositioner.movetostart: self.connect_measurement_signals}
+        # Widgets switched together by 'motion_detection()' (built once, it runs every 100 ms)
+        self.status_LEDs = (self.clearLED_pushButton, self.initLED_pushButton, self.runLED_pushButton)
+        self.measurement_buttons = (self.clear_pushButton, self.run_pushButton)
+        self.scan_resolution_inputs = (self.stepsScan_spinBox, self.samplesStep_spinBox)
+        self.measurement_inputs = (self.startPos_doubleSpinBox, self.endPos_doubleSpinBox) + self.scan_resolution_inputs
         
     def load_solvents(self, caller=""):
         # Populate Solvent combobox with data from file
         if caller == "":
             try:
-                json_file = open(os.path.join(os.path.dirname(__file__), 'solvents.json'))
+                json_file = open(SOLVENTS_FILE)
             
             except FileNotFoundError:
                 self.showdialog('Warning','solvents.json not found in the default location. Select the file.')
-                path = os.path.abspath(os.path.dirname(__file__)) # this is where solvents.json is expected to be
+                path = BASE_DIR # this is where solvents.json is expected to be
                 file = QFileDialog.getOpenFileName(self, "Open File", path,filter="JSON file (*.json)")
                 if file[0]!='': # if dialog was not cancelled
                     json_file = open(file[0])
@@ -142,28 +240,31 @@ class Window(QtWidgets.QMainWindow):
             
             finally:
                 if json_file != '':
-                    self.solvents = json.load(json_file)
+                    self.set_solvents(json.load(json_file))
                     json_file.close()
-                    self.solventName_comboBox.addItems([key for key in self.solvents.keys()])
-                    self.solvent_autocomplete()
             
         elif caller == "LoadSolvents":
-            path = os.path.abspath(os.path.dirname(__file__)) # this is where solvents.json is expected to be
+            path = BASE_DIR # this is where solvents.json is expected to be
             file = QFileDialog.getOpenFileName(self, "Open File", path,filter="JSON file (*.json)")
             if file[0]!='': # if dialog was not cancelled
                 with open(file[0]) as json_file:
-                    self.solvents = json.load(json_file)
+                    self.set_solvents(json.load(json_file))
                     json_file.close()
-                    self.solventName_comboBox.addItems([key for key in self.solvents.keys()])
-                    self.solvent_autocomplete()
             else:
                 return
             
+    def set_solvents(self, solvents:dict):
+        self.solvents = solvents
+        # Display texts are formatted once here, so 'solvent_autocomplete()' only sets them
+        self.solvent_texts = {name: (str(props["density"])+' g/cm3', str(props["index"])) for name, props in solvents.items()}
+        self.solventName_comboBox.addItems([key for key in self.solvents.keys()])
+        self.solvent_autocomplete()
+
     def value_change_triggers(self):
             # Measurement Tab
-        self.endPos_doubleSpinBox.editingFinished.connect(lambda: self.measurement_plot_rescale("end"))
-        self.startPos_doubleSpinBox.editingFinished.connect(lambda: self.measurement_plot_rescale("start"))
-        self.stepsScan_spinBox.valueChanged.connect(self.measurement_plot_rescale)
+        self.endPos_doubleSpinBox.editingFinished.connect(partial(self.measurement_plot_rescale, "end"))
+        self.startPos_doubleSpinBox.editingFinished.connect(partial(self.measurement_plot_rescale, "start"))
+        self.stepsScan_spinBox.valueChanged.connect(self.measurement_plot_rescale, Qt.QueuedConnection | Qt.UniqueConnection)
             
             # Data saving Tab
         self.concentration_dataSavingTab_doubleSpinBox.editingFinished.connect(
@@ -179,15 +280,14 @@ class Window(QtWidgets.QMainWindow):
             
             # Data fitting Tab
         self.solventName_comboBox.currentIndexChanged.connect(self.solvent_autocomplete)
-        self.zscanRange_doubleSpinBox.editingFinished.connect(self.set_new_positions)
+        # Queued: the spin box finishes its own editing and repaint before the six fitting charts are updated
+        self.zscanRange_doubleSpinBox.editingFinished.connect(self.set_new_positions, Qt.QueuedConnection | Qt.UniqueConnection)
     
     def slider_triggers(self):
         # Update display related to the sliders
             # Silica
+        # One call connects all Silica CA sliders ('slider_fit_manually_connect' "All" case), more calls would duplicate the connections
         self.slider_fit_manually_connect(self.silicaCA_RayleighLength_slider,"Connect")
-        self.slider_fit_manually_connect(self.silicaCA_centerPoint_slider, "Connect")
-        self.slider_fit_manually_connect(self.silicaCA_zeroLevel_slider, "Connect")
-        self.slider_fit_manually_connect(self.silicaCA_DPhi0_slider, "Connect")
         # self.silicaCA_RayleighLength_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Silica", stype="CA"))
         # self.silicaCA_centerPoint_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Silica", stype="CA"))
         # self.silicaCA_zeroLevel_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Silica", stype="CA"))
@@ -195,15 +295,16 @@ class Window(QtWidgets.QMainWindow):
         self.silicaCA_filterSize_slider.valueChanged.connect(lambda: self.reduce_noise_in_data(self.silica_data_set, ftype="Silica", stype="CA"))
 
             # Solvent
-        self.solventCA_RayleighLength_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-        self.solventCA_centerPoint_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-        self.solventCA_zeroLevel_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-        self.solventCA_DPhi0_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
+        # One slot per aperture, shared by all of its sliders
+        fit_solventCA = lambda: self.fit_manually_debounced(ftype="Solvent", stype="CA")
+        for slider in (self.solventCA_RayleighLength_slider, self.solventCA_centerPoint_slider,
+                       self.solventCA_zeroLevel_slider, self.solventCA_DPhi0_slider):
+            slider.valueChanged.connect(fit_solventCA)
         self.solventCA_filterSize_slider.valueChanged.connect(lambda: self.reduce_noise_in_data(self.solvent_data_set, ftype="Solvent", stype="CA"))
 
-        self.solventOA_centerPoint_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
-        self.solventOA_zeroLevel_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
-        self.solventOA_T_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
+        fit_solventOA = lambda: self.fit_manually_debounced(ftype="Solvent", stype="OA")
+        for slider in (self.solventOA_centerPoint_slider, self.solventOA_zeroLevel_slider, self.solventOA_T_slider):
+            slider.valueChanged.connect(fit_solventOA)
         self.solventOA_filterSize_slider.valueChanged.connect(lambda: self.reduce_noise_in_data(self.solvent_data_set, ftype="Solvent", stype="OA"))
 
     def clicker_triggers(self):
@@ -217,7 +318,7 @@ class Window(QtWidgets.QMainWindow):
 
         # Measurement Tab
         self.clear_pushButton.clicked.connect(self.measurement_clear)
-        self.focusAt_comboBox.currentTextChanged.connect(lambda: self.measurement_plot_rescale(self.focusAt_comboBox.currentText()))
+        self.focusAt_comboBox.currentTextChanged.connect(self.measurement_plot_rescale) # the signal passes the current text itself
         self.initialize_pushButton.clicked.connect(self.initialize)
         self.run_pushButton.clicked.connect(self.set_to_start)
 
@@ -270,15 +371,17 @@ class Window(QtWidgets.QMainWindow):
         device_name = "/Dev1"
         self.detector_core_name = device_name+"/ai"
         self.number_of_channels_used = 3
+        # Raw log line: step number, one column per used channel and the empty last channel
+        self.raw_log_line_template = "{:4d} " + self.number_of_channels_used*"  {:12.8f}         " + "  {:12.8f}"
         
         print('Detectors initialized')
 
         # Initialize data dictionaries and apply empty data to lines
+        self.allocate_data_buffers(self.stepsScan_spinBox.value()+1)
         for type, chart in self.charts.items():             # e.g.: take the tuple ("relative", "self.rel_chart")
             for chan_no in range(self.number_of_channels_used):
-                self.data[type].update({chan_no: []})       # then fill "relative" dictionary in "self.data" dictionary with pairs of channel number and list of values.
-                line, = chart.axes.plot(self.data["positions"],self.data[type][chan_no], marker='.') # add empty line for each channel on the "relative" chart
-                self.measurement_lines[type].update({chan_no: line})    # update the "lines" dictionary with line for each channel
+                line, = chart.axes.plot(self.data["positions"][:0],self.data[type][chan_no,:0], marker='.') # add empty line for each channel on the "relative" chart
+                self.measurement_lines[type].append(line)   # one line per channel, indexed by channel number
         
         # Initialize translation stage motor
         self.motor_detection_and_homing()
@@ -300,13 +403,14 @@ class Window(QtWidgets.QMainWindow):
         layout_abs = self.absolute_layout
         layout_abs.addWidget(self.abs_chart)
 
-        self.rms_text = self.abs_chart.axes.text(0.87,0.9, f"RMS noise = {self.rms_value*100:.3f}%", transform=self.abs_chart.axes.transAxes,
+        self.rms_text = self.abs_chart.axes.text(0.87,0.9, RMS_TEXT.format(self.rms_value*100), transform=self.abs_chart.axes.transAxes,
                                                  bbox = dict(boxstyle='round', facecolor='white', alpha=1))
         
         self.charts = {"relative": self.rel_chart, "absolute": self.abs_chart}
         # initialize empty lines and data dictionaries
-        self.measurement_lines = {"relative": {}, "absolute": {}}
-        self.data = {"positions": [], "relative": {}, "absolute": {}}
+        self.measurement_lines = {"relative": [], "absolute": []}
+        # positions: (points,), relative/absolute: (channels, points) buffers, see 'allocate_data_buffers()'
+        self.data = {"positions": np.zeros(0), "relative": np.zeros((0,0)), "absolute": np.zeros((0,0))}
 
         self.measurement_plot_rescale()
 
@@ -370,73 +474,28 @@ class Window(QtWidgets.QMainWindow):
         
 # MOTOR NAVIGATION
     def motion_detection(self):
+        # One status LED is lit at a time, initializing takes precedence over running, and running over clearing
         if self.initializing == True:
-            self.clearLED_pushButton.setEnabled(False)
-            self.initLED_pushButton.setEnabled(True)
+            lit_led = self.initLED_pushButton
             self.initialize_pushButton.setEnabled(False)
-            self.runLED_pushButton.setEnabled(False)
         elif self.running == True:
-            self.clearLED_pushButton.setEnabled(False)
-            self.initLED_pushButton.setEnabled(False)
-            self.runLED_pushButton.setEnabled(True)
+            lit_led = self.runLED_pushButton
         elif self.clearing == True:
-            self.clearLED_pushButton.setEnabled(True)
-            self.initLED_pushButton.setEnabled(False)
-            self.runLED_pushButton.setEnabled(False)
+            lit_led = self.clearLED_pushButton
         else:
-            self.clearLED_pushButton.setEnabled(False)
-            self.initLED_pushButton.setEnabled(False)
-            self.runLED_pushButton.setEnabled(False)
-
-        if hasattr(self,'motor'):
-            if self.motor.is_in_motion == True:
-                self.clear_pushButton.setEnabled(False)
-                self.run_pushButton.setEnabled(False)
-                self.waitLED_pushButton.setEnabled(True)
-                
-                self.stepsScan_spinBox.setEnabled(False)
-                self.samplesStep_spinBox.setEnabled(False)
-
-            else:
-                if self.initializing == True:
-                    self.clear_pushButton.setEnabled(False)
-                    self.run_pushButton.setEnabled(False)
-                    self.waitLED_pushButton.setEnabled(True)
-                    
-                    self.startPos_doubleSpinBox.setEnabled(False)
-                    self.endPos_doubleSpinBox.setEnabled(False)
-                    self.stepsScan_spinBox.setEnabled(False)
-                    self.samplesStep_spinBox.setEnabled(False)
-
-                elif self.running == True:
-                    self.clear_pushButton.setEnabled(False)
-                    self.run_pushButton.setEnabled(False)
-                    self.waitLED_pushButton.setEnabled(True)
-
-                    self.startPos_doubleSpinBox.setEnabled(False)
-                    self.endPos_doubleSpinBox.setEnabled(False)
-                    self.stepsScan_spinBox.setEnabled(False)
-                    self.samplesStep_spinBox.setEnabled(False)
-
-                elif self.clearing == True:
-                    self.clear_pushButton.setEnabled(False)                    
-                    self.run_pushButton.setEnabled(False)
-                    self.waitLED_pushButton.setEnabled(True)
-                    
-                    self.startPos_doubleSpinBox.setEnabled(False)
-                    self.endPos_doubleSpinBox.setEnabled(False)
-                    self.stepsScan_spinBox.setEnabled(False)
-                    self.samplesStep_spinBox.setEnabled(False)
-
-                else:
-                    self.clear_pushButton.setEnabled(True)
-                    self.run_pushButton.setEnabled(True)
-                    self.waitLED_pushButton.setEnabled(False)
-
-                    self.startPos_doubleSpinBox.setEnabled(True)
-                    self.endPos_doubleSpinBox.setEnabled(True)
-                    self.stepsScan_spinBox.setEnabled(True)
-                    self.samplesStep_spinBox.setEnabled(True)
+            lit_led = None
+        for led in self.status_LEDs:
+            led.setEnabled(led is lit_led)
+
+        if self.motor_connected == True:
+            in_motion = self.motor.is_in_motion
+            busy = in_motion or self.initializing or self.running or self.clearing
+            for button in self.measurement_buttons:
+                button.setEnabled(not busy)
+            self.waitLED_pushButton.setEnabled(busy)
+            # While moving, only the scan resolution is locked; the range stays as it was
+            for widget in (self.scan_resolution_inputs if in_motion else self.measurement_inputs):
+                widget.setEnabled(not busy)
         
         if self.data_acquisition_complete == False:
             self.update_pushButton.setEnabled(False)
@@ -444,6 +503,12 @@ class Window(QtWidgets.QMainWindow):
         else:
             self.update_pushButton.setEnabled(True)
 
+    def preload_motor_driver(self, *args, **kwargs):
+        '''Imports thorlabs_apt in a worker thread at startup.\n
+        Loading the APT library takes a few seconds; afterwards the import in
+        'motor_detection_and_homing()' is just a lookup in sys.modules.'''
+        import thorlabs_apt
+
     def motor_detection_and_homing(self, *args, **kwargs):
         motor_id = 40180184
 
@@ -451,6 +516,7 @@ class Window(QtWidgets.QMainWindow):
         
         try:
             self.motor = apt.Motor(motor_id)
+            self.motor_connected = True
             self.ocx.configure(motor_id)
             print(f'Motor {motor_id} connected')
         
@@ -461,14 +527,27 @@ class Window(QtWidgets.QMainWindow):
         
         self.mpositioner = MotorPositioner()
         self.motor.backlash_distance = 0
-        self.thread_it(self.mpositioner.movehome)
+        self.start_motor_job(self.mpositioner.movehome)
 
     def set_custom_pos(self):
-        self.thread_it(self.mpositioner.movetocustompos)
+        self.start_motor_job(self.mpositioner.movetocustompos)
 
     def set_to_start(self):
+        if self.motor_busy.locked():
+            logger.warning("The motor is busy, the scan was not started")
+            return
         self.running = True
-        self.thread_it(self.mpositioner.movetostart)
+        # Read the scan settings once here and hand them to the worker
+        start_pos = self.startPos_doubleSpinBox.value()
+        end_pos = self.endPos_doubleSpinBox.value()
+        number_of_steps = self.stepsScan_spinBox.value()
+        self.scan_steps = number_of_steps # cached for the per-step slots (e.g. 'create_raw_log_line()')
+        self.allocate_data_buffers(number_of_steps+1)
+        # The raw log cache follows the buffers, it holds only the lines of this scan
+        self.raw_log_lines.clear()
+        self.rawLogData_textBrowser.clear()
+        stepsize = (end_pos-start_pos)/number_of_steps
+        self.start_motor_job(self.mpositioner.movetostart, start_pos=start_pos, end_pos=end_pos, number_of_steps=number_of_steps, stepsize=stepsize)
 
 # GUI EVENTS TIMING
     def start_timer(self):
@@ -478,9 +557,10 @@ class Window(QtWidgets.QMainWindow):
     #    self.timer.stop()
 
     def stop_experiment(self):
-        if hasattr(self,'motor'):
+        if self.motor_connected == True:
             self.motor.stop_profiled()
             self.experiment_stopped = True
+            self.mpositioner.stop_requested.set()
                         
             self.initializing = False
             self.running = False
@@ -493,23 +573,22 @@ class Window(QtWidgets.QMainWindow):
         self.clearing = True
         self.data_acquisition_complete = False
 
-        self.data["positions"] = []     # reset positions to empty list
+        # New buffers, so that anything still holding the old ones (e.g. data sent to fitting) is left intact
+        self.allocate_data_buffers(self.data["positions"].shape[0], reuse=False)
         
         self.rms_value = 0.0
-        self.rms_text.set_text(f"RMS noise = {self.rms_value*100:.3f}%")
+        self.rms_text.set_text(RMS_TEXT.format(self.rms_value*100))
 
         for type, chart in self.charts.items():     # e.g.: take the tuple ("relative", "self.rel_chart")
             for chan_no in range(self.number_of_channels_used):
-                self.data[type][chan_no] = []       # then fill "relative" dictionary in "self.data" dictionary empty list of values per channel
-                
                 # UPDATE LINES INSTEAD OF DELETING AND REINSTANTIATING
-                self.measurement_lines[type][chan_no].set_xdata(self.data["positions"]) # and set data of lines in "lines" dictionary to empty lists of positions and values
-                self.measurement_lines[type][chan_no].set_ydata(self.data[type][chan_no])
+                self.measurement_lines[type][chan_no].set_data(self.data["positions"][:0], self.data[type][chan_no,:0]) # empty views of the buffers
             
             chart.axes.relim()
             chart.axes.autoscale_view()
             chart.draw_idle()
 
+        self.raw_log_lines.clear()
         self.rawLogData_textBrowser.clear()
         self.fullLogData_textBrowser.clear()
 
@@ -544,21 +623,21 @@ class Window(QtWidgets.QMainWindow):
                             chart.axes.autoscale()
                         case "Closed":
                             try:
-                                chart.axes.set_ylim(min(self.data[type][0]),max(self.data[type][0]))
+                                chart.axes.set_ylim(np.min(self.data[type][0,:self.data_count]),np.max(self.data[type][0,:self.data_count]))
                                 chart.axes.relim()
                             except ValueError:
                                 #print(f'\nValueError: min() arg is an empty sequence.\nThis message was initiated by user clicking on {called_by}.\nNothing has to be done.')
                                 return
                         case "Reference":
                             try:
-                                chart.axes.set_ylim(min(self.data[type][1]),max(self.data[type][1]))
+                                chart.axes.set_ylim(np.min(self.data[type][1,:self.data_count]),np.max(self.data[type][1,:self.data_count]))
                                 chart.axes.relim()
                             except ValueError:
                                 #print(f'\nValueError: min() arg is an empty sequence.\nThis message was initiated by user clicking on {called_by}.\nNothing has to be done.')
                                 return
                         case "Open":
                             try:
-                                chart.axes.set_ylim(min(self.data[type][2]),max(self.data[type][2]))
+                                chart.axes.set_ylim(np.min(self.data[type][2,:self.data_count]),np.max(self.data[type][2,:self.data_count]))
                                 chart.axes.relim()
                             except ValueError:
                                 #print(f'\nValueError: min() arg is an empty sequence.\nThis message was initiated by user clicking on {called_by}.\nNothing has to be done.')
@@ -578,28 +657,82 @@ class Window(QtWidgets.QMainWindow):
             chart.axes.relim()
             chart.draw_idle()
 
+    def allocate_data_buffers(self, number_of_points:int, reuse:bool=True):
+        '''Prepares `self.data` buffers for a scan of `number_of_points` points: positions and (channels, points) arrays
+        of relative and absolute values. Only the first `self.data_count` points are measured data.\n
+        The buffers are reused when the number of points doesn't change, unless `reuse` is False.'''
+        if (reuse == False or self.data["positions"].shape[0] != number_of_points
+                or self.data["absolute"].shape[1] != number_of_points):
+            self.data["positions"] = np.zeros(number_of_points)
+            for type in self.charts.keys():
+                self.data[type] = np.zeros((self.number_of_channels_used, number_of_points))
+        self.data_count = 0
+
+    def process_current_datapoint(self, datapoint):
+        '''Stores the datapoint emitted by the acquisition worker and schedules the measurement charts update.\n
+        Runs in the GUI thread, so the worker never touches the data lists nor the chart lines.'''
+        self.mpositioner.display_slots.release() # first, so that the acquisition can't be left waiting
+        step, position, data_mean = datapoint
+        point = self.data_count # write cursor of the buffers
+        used_channels = data_mean[:self.number_of_channels_used]
+
+        self.data["positions"][point] = position
+        self.data["absolute"][:,point] = used_channels
+        # Divide current values by channel [1] (reference), straight into the buffer column
+        np.divide(used_channels, data_mean[1], out=self.data["relative"][:,point])
+        self.data_count = point+1
+
+        # Redraws are coalesced to at most one per MEASUREMENT_REDRAW_MS, the last point is drawn at once
+        if self.data_count == self.data["positions"].shape[0]:
+            self.data_acquisition_complete = True # set here, once the last datapoint is actually stored
+            self.measurement_redraw_timer.stop()
+            self.redraw_measurement_charts()
+        elif not self.measurement_redraw_timer.isActive():
+            self.measurement_redraw_timer.start(MEASUREMENT_REDRAW_MS)
+
+    def redraw_measurement_charts(self):
+        '''Shows all datapoints stored so far on the measurement charts.'''
+        if self.data_count == 0: # charts were cleared before the timer fired
+            return
+        # Lines get views of the measured part of the buffers, nothing is copied
+        positions = self.data["positions"][:self.data_count]
+        for type in self.charts.keys():
+            for chan_no in range(self.number_of_channels_used):
+                self.measurement_lines[type][chan_no].set_data(positions, self.data[type][chan_no,:self.data_count])
+
+        y = self.data["absolute"][1,:self.data_count]
+        self.rms_value = np.abs(np.sqrt(np.mean(y**2)) - y[0])/y[0]
+        self.rms_text.set_text(RMS_TEXT.format(self.rms_value*100))
+
+        self.measurement_plot_rescale(self.focusAt_comboBox.currentText())
+
     def create_raw_log_line(self, step):
         if window.where_to_start == "end":
-            new_step = np.abs(step-200)
-            line = f"{new_step:4d}{' '}"
+            step_to_write = self.scan_steps-step
         else:
-            line = f"{step:4d}{' '}"
+            step_to_write = step
 
-        for chan_no in range(self.number_of_channels_used):
-            line += f"{2*' '}{self.data['absolute'][chan_no][step]:12.8f}{9*' '}"
-            #line += f"{2*' '}{abs_chart_data[chan_no][step]:12.8f}{9*' '}"
+        # One format call per line instead of concatenating per channel
+        line = self.raw_log_line_template.format(
+            step_to_write, *self.data['absolute'][:,step], 0)
 
-            if chan_no == self.number_of_channels_used-1:
-                line += f"{2*' '}{0:12.8f}"
+        self.raw_log_lines.append(line) # cached in acquisition order, only the new line is formatted per step
 
         if self.where_to_start == "end":
-            old_lines = self.rawLogData_textBrowser.toPlainText()
-            self.rawLogData_textBrowser.clear()
-            self.rawLogData_textBrowser.append(line)
-            self.rawLogData_textBrowser.append(old_lines)
+            # Prepend only the new line instead of re-setting the whole document
+            document = self.rawLogData_textBrowser.document()
+            cursor = QTextCursor(document) # positioned at the start
+            cursor.insertText(line if document.isEmpty() else line+"\n")
         else:
             self.rawLogData_textBrowser.append(line)
 
+    def raw_log_text(self) -> str:
+        '''Returns the raw log built from the cached lines, in display order.\n
+        Backward scans are stored in acquisition order and reversed only here.'''
+        if self.where_to_start == "end":
+            return "\n".join(reversed(self.raw_log_lines))
+        return "\n".join(self.raw_log_lines)
+
 # SELECT DIRECTORY
     def choose_dir(self, caller=""):
         if caller == "DataSaving":
@@ -610,9 +743,9 @@ class Window(QtWidgets.QMainWindow):
         p = QFileDialog.getExistingDirectory(self, 'Select a directory', path)
         if p != "": # This keeps old path in directory QLineEdit lines, if dialog is closed with Cancel
             if caller == "DataSaving":
-                self.mainDirectory_lineEdit.setText(p.replace("/","\\"))
+                self.mainDirectory_lineEdit.setText(os.path.normpath(p))
             elif caller == "DataFitting":
-                self.dataDirectory_lineEdit.setText(p.replace("/","\\"))
+                self.dataDirectory_lineEdit.setText(os.path.normpath(p))
 
 # DATA SAVING
     def data_reverse(self):
@@ -622,83 +755,97 @@ class Window(QtWidgets.QMainWindow):
             #self.data_reversed = True
     
     def update_data_and_filenames(self):
-        self.fullLogData_textBrowser.clear()
-
-    # DATA PREVIEW
-        # Full description header
-        #if self.experimentDescription_plainTextEdit.toPlainText() != "": # this is for full log to look nicer
-        #    self.experimentDescription_plainTextEdit.appendPlainText("")
-        
-        # full log header
-        header = ("Z-scan Measurement\n"                                                                             # line 0
-                  #f"Sample type: {self.cuvetteType_comboBox.currentText()}\n"                                           
-                  f"Code: {self.codeOfSample_lineEdit.text()}\n"                                                     # line 1
-                  f"Silica thickness: {self.silicaThickness_dataSavingTab_doubleSpinBox.text()}\n"                   # line 2
-                  f"Concentration: {self.concentration_dataSavingTab_doubleSpinBox.text()}\n"                        # line 3
-                  f"Wavelength: {self.wavelength_dataSavingTab_doubleSpinBox.text()}\n"                              # line 4
-                  f"{self.experimentDescription_plainTextEdit.toPlainText()}\n"                                      # line 5
-                  "--------------------------------------------------------------------------------------------\n\n" # line 6
-                  f"Starting pos: {self.startPos_doubleSpinBox.value()}\n"                                           # line 7
-                  f"Ending pos: {self.endPos_doubleSpinBox.value()}\n"                                               # line 8
-                  "CH1:   Closed aperture\n"                                                                         # line 9
-                  "CH2:   Reference\n"                                                                               # line 10
-                  "CH3:   Open aperture\n"                                                                           # line 11
-                  "CH4:   Empty channel\n\n"                                                                         # line 12
-                  "--------------------------------------------------------------------------------------------\n\n" # line 13
-                  "SNo.  [V] Voltage Max        [V] Voltage Max        [V] Voltage Max        [V] Voltage Max\n\n"   # line 14
-                  "--------------------------------------------------------------------------------------------\n")  # line 15
-
-        raw_log = self.rawLogData_textBrowser.toPlainText()
-        self.fullLogData_textBrowser.append(header)
-        self.fullLogData_textBrowser.append(raw_log)
-
-        # log data
-        if self.data_acquisition_complete == True:
-            raw_log_data = np.genfromtxt(raw_log.split('\n'))
-            self.data['absolute'] = {0: list(raw_log_data[:,1]), 1: list(raw_log_data[:,2]), 2: list(raw_log_data[:,3])}
-            self.data_set = list(raw_log_data[:,0]), self.data["absolute"][0], self.data["absolute"][1], self.data["absolute"][2]#, data[:,3] not using the last column with zeros
+        # Qt repaints once after all the text browsers, line edits and buttons below are updated
+        with frozen_updates(self):
+            self.fullLogData_textBrowser.clear()
+
+            # DATA PREVIEW
+            # Full description header
+            #if self.experimentDescription_plainTextEdit.toPlainText() != "": # this is for full log to look nicer
+            #    self.experimentDescription_plainTextEdit.appendPlainText("")
+        
+            # full log header
+            header = ("Z-scan Measurement\n"                                                                             # line 0
+                      #f"Sample type: {self.cuvetteType_comboBox.currentText()}\n"                                           
+                      f"Code: {self.codeOfSample_lineEdit.text()}\n"                                                     # line 1
+                      f"Silica thickness: {self.silicaThickness_dataSavingTab_doubleSpinBox.text()}\n"                   # line 2
+                      f"Concentration: {self.concentration_dataSavingTab_doubleSpinBox.text()}\n"                        # line 3
+                      f"Wavelength: {self.wavelength_dataSavingTab_doubleSpinBox.text()}\n"                              # line 4
+                      f"{self.experimentDescription_plainTextEdit.toPlainText()}\n"                                      # line 5
+                      "--------------------------------------------------------------------------------------------\n\n" # line 6
+                      f"Starting pos: {self.startPos_doubleSpinBox.value()}\n"                                           # line 7
+                      f"Ending pos: {self.endPos_doubleSpinBox.value()}\n"                                               # line 8
+                      "CH1:   Closed aperture\n"                                                                         # line 9
+                      "CH2:   Reference\n"                                                                               # line 10
+                      "CH3:   Open aperture\n"                                                                           # line 11
+                      "CH4:   Empty channel\n\n"                                                                         # line 12
+                      "--------------------------------------------------------------------------------------------\n\n" # line 13
+                      "SNo.  [V] Voltage Max        [V] Voltage Max        [V] Voltage Max        [V] Voltage Max\n\n"   # line 14
+                      "--------------------------------------------------------------------------------------------\n")  # line 15
+
+            raw_log = self.raw_log_text()
+            self.fullLogData_textBrowser.append(header)
+            self.fullLogData_textBrowser.append(raw_log)
+
+            # log data
+            if self.data_acquisition_complete == True:
+                raw_log_data = np.genfromtxt(raw_log.split('\n'))
+                # Positions and channels both come from every row of the raw log, so they always line up
+                absolute = raw_log_data[:,1:self.number_of_channels_used+1].T
+                # New array in display order, the measured buffer may still be referenced by the chart lines
+                self.data['absolute'] = absolute.copy()
+                self.data_set = list(raw_log_data[:,0]), absolute[0], absolute[1], absolute[2]#, data[:,3] not using the last column with zeros
             
-            self.saveData_pushButton.setEnabled(True)
-        else:
-            self.saveData_pushButton.setEnabled(False)
+                self.saveData_pushButton.setEnabled(True)
+            else:
+                self.saveData_pushButton.setEnabled(False)
 
-    # FILENAMES
-        now = datetime.now()
-        self.cur_date = now.strftime("%Y_%m_%d")
-        self.cur_time = now.strftime("%H_%M")
-        sample_type = self.codeOfSample_lineEdit.text()
+            # FILENAMES
+            now = datetime.now()
+            self.cur_date = now.strftime("%Y_%m_%d")
+            self.cur_time = now.strftime("%H_%M")
+            sample_type = self.codeOfSample_lineEdit.text()
         
-        concentration = self.concentration_dataSavingTab_doubleSpinBox.value()
-        conc_hyphen = str(f"{concentration:.2f}").replace(".","-")
+            concentration = self.concentration_dataSavingTab_doubleSpinBox.value()
+            conc_hyphen = str(f"{concentration:.2f}").replace(".","-")
 
-        wavelength = self.wavelength_dataSavingTab_doubleSpinBox.value()
-        wavel_hyphen = str(f"{wavelength:.1f}").replace(".","-")
+            wavelength = self.wavelength_dataSavingTab_doubleSpinBox.value()
+            wavel_hyphen = str(f"{wavelength:.1f}").replace(".","-")
         
-        self.rawLogFilename_lineEdit.setText(f"{self.cur_date}__{self.cur_time}__{sample_type}_{conc_hyphen}_{wavel_hyphen}.txt")
-        self.fullLogFilename_lineEdit.setText(f"{self.cur_date}__{self.cur_time}__{sample_type}_{conc_hyphen}_{wavel_hyphen}_2.txt")
+            self.rawLogFilename_lineEdit.setText(f"{self.cur_date}__{self.cur_time}__{sample_type}_{conc_hyphen}_{wavel_hyphen}.txt")
+            self.fullLogFilename_lineEdit.setText(f"{self.cur_date}__{self.cur_time}__{sample_type}_{conc_hyphen}_{wavel_hyphen}_2.txt")
 
-        self.files = (self.rawLogFilename_lineEdit.text(), self.fullLogFilename_lineEdit.text())
+            self.files = (self.rawLogFilename_lineEdit.text(), self.fullLogFilename_lineEdit.text())
     
     def data_save(self):
         self.accurate_path = os.path.join(self.mainDirectory_lineEdit.text(),self.cur_date)
+        # Texts are collected here in the GUI thread, the files are written in the thread pool
+        contents = (self.raw_log_text(), self.fullLogData_textBrowser.toPlainText())
         
-        try:
-            if not os.path.exists(self.accurate_path):
-                os.mkdir(self.accurate_path)
-            
-            for file in self.files:
-                with open(os.path.join(self.accurate_path,file), 'w') as f:
-                    if self.files.index(file) == 0:
-                        f.write(self.rawLogData_textBrowser.toPlainText())
-                    else:
-                        f.write(self.fullLogData_textBrowser.toPlainText())
-            
-            self.saveData_pushButton.setEnabled(False)
-            self.sendToFit_pushButton.setEnabled(True)
-            self.showdialog('Info', "Files successfully written!")
-        
-        except PermissionError:
+        self.saveData_pushButton.setEnabled(False)
+        worker = Worker(self.write_data_files, self.accurate_path, self.files, contents)
+        worker.signals.result.connect(self.data_save_finished)
+        worker.signals.error.connect(self.data_save_failed)
+        self.io_threadpool.start(worker)
+
+    def write_data_files(self, path, files, contents, *args, **kwargs):
+        os.makedirs(path, exist_ok=True) # no separate stat before creating the directory
+        
+        for file, content in zip(files, contents):
+            with open(os.path.join(path,file), 'w') as f:
+                f.write(content)
+
+    def data_save_finished(self, *args):
+        self.sendToFit_pushButton.setEnabled(True)
+        self.showdialog('Info', "Files successfully written!")
+
+    def data_save_failed(self, error:tuple):
+        exctype, value, _ = error
+        self.saveData_pushButton.setEnabled(True)
+        if issubclass(exctype, PermissionError):
             self.showdialog('Error', 'Permission denied!\nCannot write the file in this directory.')
+        else:
+            self.showdialog('Error', f'Cannot write the files.\n{value}')
 
 # DATA FITTING
     def data_loader(self, caller:str, ftype:str):
@@ -724,7 +871,8 @@ class Window(QtWidgets.QMainWindow):
                     self.sampleAperture_tabWidget.setCurrentIndex(0)
             
             # Get data
-            self.data_set = range(self.stepsScan_spinBox.value()+1), self.data["absolute"][0], self.data["absolute"][1], self.data["absolute"][2]#, data[:,3] not using the last column with zeros
+            absolute = self.data["absolute"][:,:self.data_count].copy() # the next scan reuses the buffers
+            self.data_set = range(self.data_count), absolute[0], absolute[1], absolute[2]#, data[:,3] not using the last column with zeros
             
             # Read parameters
             self.read_header_params(caller = "Current Measurement", ftype=ftype)
@@ -774,30 +922,27 @@ class Window(QtWidgets.QMainWindow):
             p = QFileDialog.getOpenFileName(self, 'Select full description file', os.path.normpath(self.dataDirectory_lineEdit.text()))
             if p[0] != "": # This keeps old filename in given file type QLineEdit lines, if dialog is closed with Cancel
                 p = p[0]
-                fname = p.split("/")[-1]
-                self.dataDirectory_lineEdit.setText("\\".join(p.split("/")[:-1]))
+                fname = os.path.basename(p)
+                self.dataDirectory_lineEdit.setText(os.path.normpath(os.path.dirname(p)))
                 
                 # Header check and manipulation
                 with open(p, 'r') as file:
-                    # Correct header must include these and a beacon at the end in the form of "SNo" substring
-                    required_matches = ["Concentration","Wavelength","Starting pos","Ending pos", "SNo"]
-                    optional_matches = ["Silica thickness"]
-                    header_matches = len(required_matches)*[False]
+                    header_matches = len(REQUIRED_HEADER_PATTERNS)*[False]
                     self.header = []
                     last_header_line = 0
 
                     for line_no, l in enumerate(file):
-                        for match in required_matches:
-                            if re.match(r"\b%s\b" % match, l): # lookup whole words
-                                header_matches[required_matches.index(match)] = True
+                        for match_no, (match, pattern) in enumerate(REQUIRED_HEADER_PATTERNS):
+                            if pattern.match(l): # lookup whole words
+                                header_matches[match_no] = True
                                 self.header.append(l.strip())
 
                                 if match == "SNo": # This is the header end beacon
                                     last_header_line = line_no+3
                         
                         opt_matched = 0
-                        for opt_match in optional_matches:
-                            if re.match(r"\b%s\b" % opt_match, l): # lookup whole words
+                        for _, opt_pattern in OPTIONAL_HEADER_PATTERNS:
+                            if opt_pattern.match(l): # lookup whole words
                                 header_matches.append(True)
                                 self.header.append(l.strip())
                                 opt_matched += 1
@@ -836,50 +981,24 @@ class Window(QtWidgets.QMainWindow):
                         load_data()
 
     def enable_custom(self, o:str):
-        """Toggles readOnly parameter on `o` element from GUI. Uses match-case structure with `o` parameter to match\n
-        to speed up processing at each call.
+        """Toggles readOnly parameter on `o` element from GUI. Plain read-only toggles are looked up in `CUSTOM_READONLY_FIELDS`,\n
+        the remaining cases use match-case structure with `o` parameter to match.
 
         Args:
             o (str): case for parameter to toggle
         """        
+        readonly_toggle = CUSTOM_READONLY_FIELDS.get(o)
+        if readonly_toggle is not None:
+            checkbox, field = readonly_toggle
+            getattr(self, field).setReadOnly(not getattr(self, checkbox).isChecked())
+            return
+        
         match o:
-            case 'ApertureDiameter':
-                if self.customApertureDiameter_checkBox.isChecked() == True:
-                    self.apertureDiameter_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.apertureDiameter_doubleSpinBox.setReadOnly(True)
-            case 'ApertureDistance':
-                if self.customApertureToFocusDistance_checkBox.isChecked() == True:
-                    self.apertureToFocusDistance_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.apertureToFocusDistance_doubleSpinBox.setReadOnly(True)
-            case 'SilicaThickness': 
-                if self.customSilicaThickness_checkBox.isChecked() == True:
-                    self.silicaThickness_dataFittingTab_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.silicaThickness_dataFittingTab_doubleSpinBox.setReadOnly(True)
-            case 'Wavelength':
-                if self.customWavelength_checkBox.isChecked() == True:
-                    self.wavelength_dataFittingTab_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.wavelength_dataFittingTab_doubleSpinBox.setReadOnly(True)
-            case 'ZscanRange':
-                if self.customZscanRange_checkBox.isChecked() == True:
-                    self.zscanRange_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.zscanRange_doubleSpinBox.setReadOnly(True)
-            case 'Concentration':
-                if self.customConcentration_checkBox.isChecked() == True:
-                    self.concentration_dataFittingTab_doubleSpinBox.setReadOnly(False)
-                else:
-                    self.concentration_dataFittingTab_doubleSpinBox.setReadOnly(True)
             case 'SolventBeamwaist':
                 if self.solventCA_customBeamwaist_checkBox.isChecked() == False:
                     self.solventCA_RayleighLength_slider.setEnabled(False)
                     if hasattr(window, 'silicaCA_beamwaist'):
-                        self.solventCA_RayleighLength_slider.valueChanged.disconnect()
-                        self.solventCA_RayleighLength_slider.setValue(int(round(self.silicaCA_beamwaist*1E6)))
-                        self.solventCA_RayleighLength_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
+                        self.set_slider_values({self.solventCA_RayleighLength_slider: int(round(self.silicaCA_beamwaist*1E6))})
                         self.solventCA_beamwaistSummary_doubleSpinBox.setValue(self.silicaCA_beamwaist*1E6)
                         
                 else:
@@ -939,8 +1058,9 @@ class Window(QtWidgets.QMainWindow):
                         for s in available_sliders[5]:
                             s.valueChanged.connect(lambda: self.fit_manually(ftype="Sample", stype="OA", activated_by=self.disconnected_sliders))
                     case "All":
+                        fit_silicaCA = lambda: self.fit_manually_debounced(ftype="Silica", stype="CA")
                         for s in available_sliders[0]:
-                            s.valueChanged.connect(lambda: self.fit_manually(ftype="Silica", stype="CA"))
+                            s.valueChanged.connect(fit_silicaCA)
                         # for s in available_sliders[1]:
                         #     s.valueChanged.connect(lambda: self.fit_manually(ftype="Silica", stype="OA"))
                         # for s in available_sliders[2]:
@@ -956,83 +1076,62 @@ class Window(QtWidgets.QMainWindow):
                 pass
     
     def toggle_absorption_model(self, ftype):
-        match ftype:
-            case "Solvent":
-                if self.solventOA_isAbsorption_checkBox.isChecked() == False:
-                    self.solventOA_absorptionModel_label.setVisible(True)
-                    self.solventOA_absorptionModel_comboBox.setVisible(True)
-                    self.solventOA_fixROI_checkBox.setVisible(True)
-                else:
-                    self.solventOA_absorptionModel_label.setVisible(False)
-                    self.solventOA_absorptionModel_comboBox.setVisible(False)
-                    self.solventOA_fixROI_checkBox.setVisible(False)
-        
-            case "Sample":
-                if self.sampleOA_isAbsorption_checkBox.isChecked() == False:
-                    self.sampleOA_absorptionModel_label.setVisible(True)
-                    self.sampleOA_absorptionModel_comboBox.setVisible(True)
-                    self.sampleOA_fixROI_checkBox.setVisible(True)
-                else:
-                    self.sampleOA_absorptionModel_label.setVisible(False)
-                    self.sampleOA_absorptionModel_comboBox.setVisible(False)
-                    self.sampleOA_fixROI_checkBox.setVisible(False)
+        if ftype not in ABSORPTION_MODEL_FIELDS:
+            return
+        checkbox, fields = ABSORPTION_MODEL_FIELDS[ftype]
+        visible = not getattr(self, checkbox).isChecked()
+        # The form is laid out once after all the widgets are shown or hidden
+        with frozen_updates(self):
+            for field in fields:
+                getattr(self, field).setVisible(visible)
     
     def toggle_saturation_model(self, ftype):
-        match ftype:
-            case "Solvent":
-                if self.solventOA_isAbsorption_checkBox.isChecked() == False:
-                    models = ["SA", "2PA+SA"] #, "RSA"]
-                    if self.solventOA_absorptionModel_comboBox.currentText() in models:
-                        self.solventOA_saturationModel_label.setVisible(True)
-                        self.solventOA_saturationModel_comboBox.setVisible(True)
-                    else:
-                        self.solventOA_saturationModel_label.setVisible(False)
-                        self.solventOA_saturationModel_comboBox.setVisible(False)
-            case "Sample":
-                if self.sampleOA_isAbsorption_checkBox.isChecked() == False:
-                    models = ["SA", "2PA+SA"] #, "RSA"]
-                    if self.sampleOA_absorptionModel_comboBox.currentText() in models:
-                        self.sampleOA_saturationModel_label.setVisible(True)
-                        self.sampleOA_saturationModel_comboBox.setVisible(True)
-                    else:
-                        self.sampleOA_saturationModel_label.setVisible(False)
-                        self.sampleOA_saturationModel_comboBox.setVisible(False)
+        if ftype not in SATURATION_MODEL_FIELDS:
+            return
+        checkbox, model_combobox, fields = SATURATION_MODEL_FIELDS[ftype]
+        if getattr(self, checkbox).isChecked() == False:
+            visible = getattr(self, model_combobox).currentText() in SATURATION_MODELS
+            with frozen_updates(self):
+                for field in fields:
+                    getattr(self, field).setVisible(visible)
 
     def switch_fitting_to_on_state(self, ftype:str):
-        match ftype:
-            case "Silica":
-                self.silicaCA_RayleighLength_slider.setEnabled(True)
-                self.silicaCA_centerPoint_slider.setEnabled(True)
-                self.silicaCA_zeroLevel_slider.setEnabled(True)
-                self.silicaCA_DPhi0_slider.setEnabled(True)
-                self.silicaCA_fit_pushButton.setEnabled(True)
-                self.silicaCA_filterSize_slider.setEnabled(True)
+        # Up to sixteen widgets change state below, let Qt repaint them once
+        with frozen_updates(self):
+            match ftype:
+                case "Silica":
+                    self.silicaCA_RayleighLength_slider.setEnabled(True)
+                    self.silicaCA_centerPoint_slider.setEnabled(True)
+                    self.silicaCA_zeroLevel_slider.setEnabled(True)
+                    self.silicaCA_DPhi0_slider.setEnabled(True)
+                    self.silicaCA_fit_pushButton.setEnabled(True)
+                    self.silicaCA_filterSize_slider.setEnabled(True)
 
-            case "Solvent":
-                if self.solventCA_customBeamwaist_checkBox.isChecked() == True:
-                    self.solventCA_RayleighLength_slider.setEnabled(True)
-                else:
-                    self.solventCA_RayleighLength_slider.setEnabled(False)
-                self.solventCA_centerPoint_slider.setEnabled(True)
-                self.solventCA_zeroLevel_slider.setEnabled(True)
-                self.solventCA_DPhi0_slider.setEnabled(True)
-                self.solventCA_fit_pushButton.setEnabled(True)
-                self.solventCA_filterSize_slider.setEnabled(True)
-                self.solventCA_customBeamwaist_checkBox.setEnabled(True)
+                case "Solvent":
+                    if self.solventCA_customBeamwaist_checkBox.isChecked() == True:
+                        self.solventCA_RayleighLength_slider.setEnabled(True)
+                    else:
+                        self.solventCA_RayleighLength_slider.setEnabled(False)
+                    self.solventCA_centerPoint_slider.setEnabled(True)
+                    self.solventCA_zeroLevel_slider.setEnabled(True)
+                    self.solventCA_DPhi0_slider.setEnabled(True)
+                    self.solventCA_fit_pushButton.setEnabled(True)
+                    self.solventCA_filterSize_slider.setEnabled(True)
+                    self.solventCA_customBeamwaist_checkBox.setEnabled(True)
                 
-                self.solventOA_centerPoint_slider.setEnabled(True)
-                self.solventOA_zeroLevel_slider.setEnabled(True)
-                self.solventOA_T_slider.setEnabled(True)
-                self.solventOA_centerPoint_doubleSpinBox.setEnabled(True)
-                self.solventOA_zeroLevel_doubleSpinBox.setEnabled(True)
-                self.solventOA_T_doubleSpinBox.setEnabled(True)
-                self.solventOA_fit_pushButton.setEnabled(True)
-                self.solventOA_filterSize_slider.setEnabled(True)
-                self.solventOA_isAbsorption_checkBox.setEnabled(True)
-                self.solventOA_customCenterPoint_checkBox.setEnabled(True)
+                    self.solventOA_centerPoint_slider.setEnabled(True)
+                    self.solventOA_zeroLevel_slider.setEnabled(True)
+                    self.solventOA_T_slider.setEnabled(True)
+                    self.solventOA_centerPoint_doubleSpinBox.setEnabled(True)
+                    self.solventOA_zeroLevel_doubleSpinBox.setEnabled(True)
+                    self.solventOA_T_doubleSpinBox.setEnabled(True)
+                    self.solventOA_fit_pushButton.setEnabled(True)
+                    self.solventOA_filterSize_slider.setEnabled(True)
+                    self.solventOA_isAbsorption_checkBox.setEnabled(True)
+                    self.solventOA_customCenterPoint_checkBox.setEnabled(True)
         
-            case "Sample":
-                pass
+                case "Sample":
+                    pass
     
     def set_fit_summary(self, ftype:str, stype:str, caller=""):
         """Sets proper number of digits in summary display and shows parameters (with errors) after (automatic) fitting.
@@ -1301,8 +1400,9 @@ class Window(QtWidgets.QMainWindow):
         
         if stype == "CA":
             try:
-                ymax_pos = np.where(fit_y==np.max(fit_y))[0][0]
-                ymin_pos = np.where(fit_y==np.min(fit_y))[0][0]
+                # Single pass for each extremum; the indices are reused below instead of rescanning the curve
+                ymax_pos = int(np.argmax(fit_y))
+                ymin_pos = int(np.argmin(fit_y))
                 
                 if ymax_pos > ymin_pos:
                     deltaTpv_sign = 1
@@ -1311,7 +1411,7 @@ class Window(QtWidgets.QMainWindow):
                 else:
                     deltaTpv_sign = 0
                 
-                deltaTpv = deltaTpv_sign*abs(np.max(fit_y)-np.min(fit_y))
+                deltaTpv = deltaTpv_sign*abs(fit_y[ymax_pos]-fit_y[ymin_pos])
                 deltaPhi0 = deltaTpv/0.406
                 deltaZpv = abs(fit_x[ymax_pos]-fit_x[ymin_pos])*1E-3 # [m]
                 rayleighLength = deltaZpv/1.7 # [m] Rayleigh length
@@ -1319,7 +1419,7 @@ class Window(QtWidgets.QMainWindow):
                 return deltaPhi0, beamwaist, rayleighLength
             
             except TypeError:
-                print('Something is wrong while interpreting the closed aperture curve.')
+                logger.warning('Something is wrong while interpreting the closed aperture curve.')
         
         elif stype == "OA":
             pass
@@ -1331,62 +1431,43 @@ class Window(QtWidgets.QMainWindow):
         match ftype:
             case "Silica":
                 # Silica CA sliders
-                # Because change in slider value triggers the 'fit_manually' method, it has to be disabled.
-                self.silicaCA_RayleighLength_slider.valueChanged.disconnect()
-                self.silicaCA_centerPoint_slider.valueChanged.disconnect()
-                self.silicaCA_zeroLevel_slider.valueChanged.disconnect()
-                self.silicaCA_DPhi0_slider.valueChanged.disconnect()
-                
-                self.silicaCA_RayleighLength_slider.setValue(int(round(self.silica_rayleighLength*self.silicaCA_RayleighLength_slider.maximum()/(self.z_range/2))))
-                self.silicaCA_centerPoint_slider.setValue(int(round(self.silicaCA_centerPoint+self.silicaCA_centerPoint_slider.maximum()/2)))
-                self.silicaCA_zeroLevel_slider.setValue(int(round(self.silicaCA_zeroLevel*100)))
-                self.silicaCA_DPhi0_slider.setValue(
-                    int(round(self.silicaCA_DPhi0/np.pi*self.silicaCA_DPhi0_slider.maximum())))
-
-                # And now when all is updated by the 'fit_automatically', reconnect the sliders to their slots
-                self.slider_triggers()
+                self.set_slider_values({
+                    self.silicaCA_RayleighLength_slider: int(round(self.silica_rayleighLength*self.silicaCA_RayleighLength_slider.maximum()/(self.z_range/2))),
+                    self.silicaCA_centerPoint_slider: int(round(self.silicaCA_centerPoint+self.silicaCA_centerPoint_slider.maximum()/2)),
+                    self.silicaCA_zeroLevel_slider: int(round(self.silicaCA_zeroLevel*100)),
+                    self.silicaCA_DPhi0_slider: int(round(self.silicaCA_DPhi0/np.pi*self.silicaCA_DPhi0_slider.maximum()))})
             
             case "Solvent":
                 if stype == "CA":
                     # Solvent CA sliders
-                    # Because change in slider value triggers the 'fit_manually' method, it has to be disabled.
-                    self.solventCA_RayleighLength_slider.valueChanged.disconnect()
-                    self.solventCA_centerPoint_slider.valueChanged.disconnect()
-                    self.solventCA_zeroLevel_slider.valueChanged.disconnect()
-                    self.solventCA_DPhi0_slider.valueChanged.disconnect()
-
                     if self.solventCA_customBeamwaist_checkBox.isChecked() == False:
-                        self.solventCA_RayleighLength_slider.setValue(self.silicaCA_RayleighLength_slider.value())
+                        rayleigh_length_value = self.silicaCA_RayleighLength_slider.value()
                     else:
-                        self.solventCA_RayleighLength_slider.setValue(int(round(self.solventCA_beamwaist*1E6)))
-                    self.solventCA_centerPoint_slider.setValue(int(round(self.solventCA_centerPoint+50)))
-                    self.solventCA_zeroLevel_slider.setValue(int(round(self.solventCA_zeroLevel*100)))
-                    self.solventCA_DPhi0_slider.setValue(int(round(self.solventCA_DPhi0*0.406*self.solventCA_DPhi0_slider.maximum()/5)))
-
-                    # And now when all is updated by the 'fit_automatically', reconnect the sliders to their slots
-                    self.solventCA_RayleighLength_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-                    self.solventCA_centerPoint_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-                    self.solventCA_zeroLevel_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
-                    self.solventCA_DPhi0_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="CA"))
+                        rayleigh_length_value = int(round(self.solventCA_beamwaist*1E6))
+                    self.set_slider_values({
+                        self.solventCA_RayleighLength_slider: rayleigh_length_value,
+                        self.solventCA_centerPoint_slider: int(round(self.solventCA_centerPoint+50)),
+                        self.solventCA_zeroLevel_slider: int(round(self.solventCA_zeroLevel*100)),
+                        self.solventCA_DPhi0_slider: int(round(self.solventCA_DPhi0*0.406*self.solventCA_DPhi0_slider.maximum()/5))})
                 
                 elif stype == "OA":
                     # Solvent OA sliders
-                    # Because change in slider value triggers the 'fit_manually' method, it has to be disabled.
-                    self.solventOA_centerPoint_slider.valueChanged.disconnect()
-                    self.solventOA_zeroLevel_slider.valueChanged.disconnect()
-                    self.solventOA_T_slider.valueChanged.disconnect()
-
-                    self.solventOA_centerPoint_slider.setValue(int(round(self.solventOA_centerPoint+50)))
-                    self.solventOA_zeroLevel_slider.setValue(int(round(self.solventOA_zeroLevel*100)))
-                    self.solventOA_T_slider.setValue(int(round(self.solventOA_T*self.solventOA_T_slider.maximum()/SOLVENT_T_SLIDER_MAX)))
-
-                    # And now when all is updated by the 'fit_automatically', reconnect the sliders to their slots
-                    self.solventOA_centerPoint_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
-                    self.solventOA_zeroLevel_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
-                    self.solventOA_T_slider.valueChanged.connect(lambda: self.fit_manually(ftype="Solvent", stype="OA"))
+                    self.set_slider_values({
+                        self.solventOA_centerPoint_slider: int(round(self.solventOA_centerPoint+50)),
+                        self.solventOA_zeroLevel_slider: int(round(self.solventOA_zeroLevel*100)),
+                        self.solventOA_T_slider: int(round(self.solventOA_T*self.solventOA_T_slider.maximum()/SOLVENT_T_SLIDER_MAX))})
 
             case "Sample":
                 pass
+
+    def set_slider_values(self, values:dict) -> None:
+        '''Sets slider positions programmatically.\n
+        Because change in slider value triggers the 'fit_manually' method, 'valueChanged' is blocked while setting the value
+        (instead of disconnecting and reconnecting every slot).'''
+        for slider, value in values.items():
+            blocker = QSignalBlocker(slider)
+            slider.setValue(value)
+            blocker.unblock()
         
     def calculate_derived_parameters(self, ftype):
         '''Calculates `laserI0` for `ftype`="Silica", `n2` and `rayleigh length` for `ftype`="Solvent/Sample"'''
@@ -1437,10 +1518,12 @@ class Window(QtWidgets.QMainWindow):
                 Tuple: Data ready for separated determination of n2 and beta nonlinear coefficients
             """            
             positions, ca_data0, ref_data0, oa_data0 = data
+            # Explicit dtype at the list->array boundary spares NumPy the dtype inference
+            ref_arr = np.asarray(ref_data0, dtype=np.float64)
             # Divide data by reference
-            ca_data = [ca/ref for ca, ref in zip(ca_data0, ref_data0)]
+            ca_data = np.asarray(ca_data0, dtype=np.float64)/ref_arr
             #ref_data = [ref/ref for ref in ref_data0]
-            oa_data = [oa/ref for oa, ref in zip(oa_data0, ref_data0)]
+            oa_data = np.asarray(oa_data0, dtype=np.float64)/ref_arr
 
             # centralize positions and normalize by z-scan range
             nop = len(positions)
@@ -1509,99 +1592,27 @@ class Window(QtWidgets.QMainWindow):
         self.get_general_parameters() # Ensures working with currently typed-in General Parameters values from GUI
         padding_vertical = 0.01
         
-        def set_limits(axes, line, direction, padding):
+        def set_limits(axes, ydata, direction, padding):
             if direction == "vertical":
-                axes.set_ylim(top=np.max(line.get_ydata())*(1+padding),bottom=np.min(line.get_ydata())*(1-padding))
+                axes.set_ylim(top=np.max(ydata)*(1+padding),bottom=np.min(ydata)*(1-padding))
         
-        match ftype:
-            case "Silica":
-                # Closed aperture
-                line = self.silicaCA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                #line.set_ydata(ca_data)
-                line.set_ydata([ca/oa for ca, oa in zip(data_set[1], data_set[3])])
-                
-                self.silicaCA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.silicaCA_figure.axes, line, "vertical", padding_vertical)
-
-                # Open aperture
-                line = self.silicaOA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                line.set_ydata(data_set[3])
-                
-                self.silicaOA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.silicaOA_figure.axes, line, "vertical", padding_vertical)
-                #self.silicaOA_figure.axes.set_ylim(top=np.max(line.get_ydata())*(1+margin_vertical),bottom=np.min(line.get_ydata())*(1-margin_vertical))
-                
-                # Update
-                self.silicaCA_figure.axes.relim()
-                self.silicaOA_figure.axes.relim()
-                
-                self.silicaCA_figure.axes.autoscale_view()
-                self.silicaOA_figure.axes.autoscale_view()
-                
-                self.silicaCA_figure.draw_idle()
-                self.silicaOA_figure.draw_idle()
-            
-            case "Solvent":
-                # Closed aperture
-                line = self.solventCA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                #line.set_ydata(ca_data)
-                line.set_ydata([ca/oa for ca, oa in zip(data_set[1], data_set[3])])
-
-                self.solventCA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.solventCA_figure.axes, line, "vertical", padding_vertical)
-                #self.solventCA_figure.axes.set_ylim(top=np.max(line.get_ydata())*(1+margin_vertical),bottom=np.min(line.get_ydata())*(1-margin_vertical))
-
-                # Open aperture
-                line = self.solventOA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                line.set_ydata(data_set[3])
-
-                self.solventOA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.solventOA_figure.axes, line, "vertical", padding_vertical)
-                #self.solventOA_figure.axes.set_ylim(top=np.max(line.get_ydata())*(1+margin_vertical),bottom=np.min(line.get_ydata())*(1-margin_vertical))
-
-                # Update
-                self.solventCA_figure.axes.relim()
-                self.solventOA_figure.axes.relim()
-
-                self.solventCA_figure.axes.autoscale_view()
-                self.solventOA_figure.axes.autoscale_view()
-
-                self.solventCA_figure.draw_idle()
-                self.solventOA_figure.draw_idle()
-
-            case "Sample":
-                # Closed aperture
-                line = self.sampleCA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                #line.set_ydata(ca_data)
-                line.set_ydata([ca/oa for ca, oa in zip(data_set[1], data_set[3])])
-
-                self.sampleCA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.sampleCA_figure.axes, line, "vertical", padding_vertical)
-                #self.sampleCA_figure.axes.set_ylim(top=np.max(line.get_ydata())*1.04,bottom=np.min(line.get_ydata())*0.96)
+        # Charts of given 'ftype' are looked up once and the same steps are applied to both apertures
+        ydata_per_stype = {"CA": np.divide(data_set[1], data_set[3]), # element-wise in C instead of zipping tuples
+                           "OA": data_set[3]}
+        
+        for stype, figure in self.fitting_charts[ftype].items():
+            axes = figure.axes
+            line = axes.get_lines()[0]
+            line.set_xdata(data_set[0])
+            line.set_ydata(ydata_per_stype[stype])
             
-                # Open aperture
-                line = self.sampleOA_figure.axes.get_lines()[0]
-                line.set_xdata(data_set[0])
-                line.set_ydata(data_set[3])
-
-                self.sampleOA_figure.axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
-                set_limits(self.sampleOA_figure.axes, line, "vertical", padding_vertical)
-                #self.sampleOA_figure.axes.set_ylim(top=np.max(line.get_ydata())*1.04,bottom=np.min(line.get_ydata())*0.96)
+            axes.set_xlim(left=-self.z_range/2*1000, right=self.z_range/2*1000) # displayed in mm
+            set_limits(axes, ydata_per_stype[stype], "vertical", padding_vertical)
             
-                # Update
-                self.sampleCA_figure.axes.relim()
-                self.sampleOA_figure.axes.relim()
-                
-                self.sampleCA_figure.axes.autoscale_view()
-                self.sampleOA_figure.axes.autoscale_view()
-
-                self.sampleCA_figure.draw_idle()
-                self.sampleOA_figure.draw_idle()
+            # Update
+            axes.relim()
+            axes.autoscale_view()
+            figure.draw_idle()
             
     def reduce_noise_in_data(self, data_set, ftype, stype) -> None:
         match ftype:
@@ -1622,52 +1633,50 @@ class Window(QtWidgets.QMainWindow):
                     filter_size = self.sampleOA_filterSize_slider.value()
 
         if (filter_size % 2 == 1 or filter_size == 0) and data_set != None:
-            try:
-                match stype:
-                    case "CA":
-                        if filter_size > 0:
-                            filtered_y = medfilt(data_set[1], filter_size)
-                        else:
-                            filtered_y = data_set[1]
-                    case "OA":
-                        if filter_size > 0:
-                            filtered_y = medfilt(data_set[3], filter_size)
-                        else:
-                            filtered_y = data_set[3]
-                
-                match ftype:
-                    case "Silica":
-                        if stype == "CA":
-                            line = self.silicaCA_figure.axes.get_lines()[0]
-                            line.set_ydata(filtered_y)
-                            
-                            self.silicaCA_figure.axes.relim()
-                            self.silicaCA_figure.axes.autoscale_view()
-                            self.silicaCA_figure.draw_idle()
-                        elif stype == "OA":
-                            pass
-                    
-                    case "Solvent":
-                        if stype == "CA":
-                            line = self.solventCA_figure.axes.get_lines()[0]
-                            line.set_ydata(filtered_y)
-                            
-                            self.solventCA_figure.axes.relim()
-                            self.solventCA_figure.axes.autoscale_view()
-                            self.solventCA_figure.draw_idle()
-                        elif stype == "OA":
-                            line = self.solventOA_figure.axes.get_lines()[0]
-                            line.set_ydata(filtered_y)
-                            
-                            self.solventOA_figure.axes.relim()
-                            self.solventOA_figure.axes.autoscale_view()
-                            self.solventOA_figure.draw_idle()
-
-                    case "Sample": pass
+            match stype:
+                case "CA":
+                    y = data_set[1]
+                case "OA":
+                    y = data_set[3]
             
-            except ValueError:
-                self.showdialog('Error',
-                'Possibly too few data points!\nMinimum required is 16 datapoints.')
+            # Only the result of the latest request for this chart gets displayed
+            request = self.noise_filter_requests.get((ftype, stype), 0) + 1
+            self.noise_filter_requests[(ftype, stype)] = request
+            
+            if filter_size > 0:
+                # The median filter runs in the thread pool, the chart is updated when the result comes back
+                worker = Worker(self.filter_noise, y, filter_size)
+                worker.signals.result.connect(partial(self.display_filtered_data, ftype, stype, request))
+                worker.signals.error.connect(self.noise_filter_failed)
+                self.io_threadpool.start(worker)
+            else:
+                self.display_filtered_data(ftype, stype, request, y)
+
+    def filter_noise(self, y, filter_size, *args, **kwargs):
+        return medfilt(y, filter_size)
+
+    def display_filtered_data(self, ftype, stype, request, filtered_y) -> None:
+        if request != self.noise_filter_requests[(ftype, stype)]:
+            return # a newer filter size has been requested meanwhile
+        
+        if ftype == "Sample" or (ftype == "Silica" and stype == "OA"):
+            return
+        
+        figure = self.fitting_charts[ftype][stype]
+        line = figure.axes.get_lines()[0]
+        line.set_ydata(filtered_y)
+        
+        figure.axes.relim()
+        figure.axes.autoscale_view()
+        figure.draw_idle()
+
+    def noise_filter_failed(self, error:tuple):
+        exctype, value, _ = error
+        if issubclass(exctype, ValueError):
+            self.showdialog('Error',
+            'Possibly too few data points!\nMinimum required is 16 datapoints.')
+        else:
+            logger.error("Noise filtering failed: %s", value)
 
     def enable_cursors(self, ftype:str, stype:str) -> None:
         match ftype:
@@ -1676,13 +1685,13 @@ class Window(QtWidgets.QMainWindow):
                     if self.silicaCA_fixROI_checkBox.isChecked() == True:
                         self.silicaCA_cursor_positioner = BlittedCursor(self.silicaCA_figure.axes, color = 'magenta', linewidth = 2)
                         self.on_mouse_move = self.silicaCA_figure.mpl_connect('motion_notify_event', self.silicaCA_cursor_positioner.on_mouse_move)
-                        self.on_mouse_click = self.silicaCA_figure.mpl_connect('button_press_event', lambda event: self.collect_cursor_clicks(event,ftype))
+                        self.on_mouse_click = self.silicaCA_figure.mpl_connect('button_press_event', partial(self.collect_cursor_clicks, ftype=ftype))
                     else:
                         try:
                             self.silicaCA_cursor_positioner.vertical_line.remove()
                             self.silicaCA_cursor_positioner.horizontal_line.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.silicaCA_figure.mpl_disconnect(self.on_mouse_move)
                             self.silicaCA_figure.mpl_disconnect(self.on_mouse_click)
@@ -1691,7 +1700,7 @@ class Window(QtWidgets.QMainWindow):
                             self.silicaCA_verline1.remove()
                             self.silicaCA_verline2.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.silicaCA_figure.draw_idle()
                     
@@ -1702,13 +1711,13 @@ class Window(QtWidgets.QMainWindow):
                     if self.solventCA_fixROI_checkBox.isChecked() == True:
                         self.solventCA_cursor_positioner = BlittedCursor(self.solventCA_figure.axes, color = 'magenta', linewidth = 2)
                         self.on_mouse_move = self.solventCA_figure.mpl_connect('motion_notify_event', self.solventCA_cursor_positioner.on_mouse_move)
-                        self.on_mouse_click = self.solventCA_figure.mpl_connect('button_press_event', lambda event: self.collect_cursor_clicks(event,ftype,stype))
+                        self.on_mouse_click = self.solventCA_figure.mpl_connect('button_press_event', partial(self.collect_cursor_clicks, ftype=ftype, stype=stype))
                     else:
                         try:
                             self.solventCA_cursor_positioner.vertical_line.remove()
                             self.solventCA_cursor_positioner.horizontal_line.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.solventCA_figure.mpl_disconnect(self.on_mouse_move)
                             self.solventCA_figure.mpl_disconnect(self.on_mouse_click)
@@ -1717,7 +1726,7 @@ class Window(QtWidgets.QMainWindow):
                             self.solventCA_verline1.remove()
                             self.solventCA_verline2.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.solventCA_figure.draw_idle()
                 
@@ -1725,13 +1734,13 @@ class Window(QtWidgets.QMainWindow):
                     if self.solventOA_fixROI_checkBox.isChecked() == True:
                         self.solventOA_cursor_positioner = BlittedCursor(self.solventOA_figure.axes, color = 'magenta', linewidth = 2)
                         self.on_mouse_move = self.solventOA_figure.mpl_connect('motion_notify_event', self.solventOA_cursor_positioner.on_mouse_move)
-                        self.on_mouse_click = self.solventOA_figure.mpl_connect('button_press_event', lambda event: self.collect_cursor_clicks(event,ftype,stype))
+                        self.on_mouse_click = self.solventOA_figure.mpl_connect('button_press_event', partial(self.collect_cursor_clicks, ftype=ftype, stype=stype))
                     else:
                         try:
                             self.solventOA_cursor_positioner.vertical_line.remove()
                             self.solventOA_cursor_positioner.horizontal_line.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.solventOA_figure.mpl_disconnect(self.on_mouse_move)
                             self.solventOA_figure.mpl_disconnect(self.on_mouse_click)
@@ -1740,7 +1749,7 @@ class Window(QtWidgets.QMainWindow):
                             self.solventOA_verline1.remove()
                             self.solventOA_verline2.remove()
                         except (AttributeError, ValueError):
-                            print("Specified cross-hair doesn't exist.")
+                            logger.debug("Specified cross-hair doesn't exist.")
                         finally:
                             self.solventOA_figure.draw_idle()
             
@@ -1964,6 +1973,22 @@ class Window(QtWidgets.QMainWindow):
 
                 pass
 
+    def fit_manually_debounced(self, ftype:str, stype:str) -> None:
+        """Triggered by fitting sliders value change. Restarts a single-shot timer, so that dragging a slider
+        calls `fit_manually` once the value settles instead of at every tick.
+
+        Args:
+            ftype (str): `Silica`, `Solvent`, `Sample`
+            stype (str): `CA`, `OA`
+        """
+        timer = self.fit_timers.get((ftype, stype))
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(partial(self.fit_manually, ftype=ftype, stype=stype))
+            self.fit_timers[(ftype, stype)] = timer
+        timer.start(FIT_DEBOUNCE_MS)
+
     def fit_manually(self, ftype:str, stype:str) -> None:
         """Triggered by loading the data (from experiment or from file) or by fitting sliders value change.
 
@@ -2038,64 +2063,87 @@ class Window(QtWidgets.QMainWindow):
         elif caller == "Load From File":
             # Get parameters from the file header
             if len(self.header) != 0:
-                for hl in self.header:
+                for hl_no, hl in enumerate(self.header):
                     if hl.find("Wavelength") != -1:
-                        wavelength_match = re.search(r'(([1-9][0-9]*\.?[0-9]*)|(\.[0-9]+))([Ee][+-]?[0-9]+)?',hl)
+                        wavelength_match = NONZERO_NUMBER_PATTERN.search(hl)
                         wavelength = float(wavelength_match.groups()[0])
                         self.wavelength_dataFittingTab_doubleSpinBox.setValue(wavelength)
                     
                     #if ftype == "Silica" and self.customZscanRange_checkBox.isChecked() == False and hl.find("Starting pos") != -1:
                     if self.customZscanRange_checkBox.isChecked() == False and hl.find("Starting pos") != -1: # read zscanRange for any ftype
-                        starting_pos_match = re.search(r'(([0-9][0-9]*\.?[0-9]*)|(\.[0-9]+))([Ee][+-]?[0-9]+)?',hl)
+                        starting_pos_match = NUMBER_PATTERN.search(hl)
                         starting_pos = float(starting_pos_match.groups()[0])
-                        next_line = self.header[self.header.index(hl)+1]
-                        end_pos_match = re.search(r'(([0-9][0-9]*\.?[0-9]*)|(\.[0-9]+))([Ee][+-]?[0-9]+)?',next_line)
+                        next_line = self.header[hl_no+1]
+                        end_pos_match = NUMBER_PATTERN.search(next_line)
                         end_pos = float(end_pos_match.groups()[0])
                         self.zscanRange_doubleSpinBox.setValue(np.abs(end_pos-starting_pos))
                     
                     if ftype == "Sample" and hl.find("Concentration") != -1:
-                        concentration_match = re.search(r'(([0-9][0-9]*\.?[0-9]*\s*%)|(\.[0-9]()\s*%+))([Ee][+-]?[0-9]()\s*%+)?',hl) # Here make sure there is % symbol
+                        concentration_match = PERCENT_PATTERN.search(hl) # Here make sure there is % symbol
                         self.concentr_percent = float(concentration_match.groups()[0].replace(' ','')[:-1]) # remove redundant space and % symbol and change to float
                         self.concentration_dataFittingTab_doubleSpinBox.setValue(self.concentr_percent)
 
     def solvent_autocomplete(self):
-        self.solventDensity_lineEdit.setText(str(self.solvents[self.solventName_comboBox.currentText()]["density"])+' g/cm3')
-        self.solventRefrIdx_lineEdit.setText(str(self.solvents[self.solventName_comboBox.currentText()]["index"]))
+        density_text, index_text = self.solvent_texts[self.solventName_comboBox.currentText()] # preformatted in 'set_solvents()'
+        self.solventDensity_lineEdit.setText(density_text)
+        self.solventRefrIdx_lineEdit.setText(index_text)
     
 # THREAD CONTROLS
     def print_output(self, returned_value):
-        print(returned_value)
+        logger.debug("%s", returned_value)
     
     def thread_complete(self):
-        print("THREAD COMPLETE!")
+        logger.debug("THREAD COMPLETE!")
     
-    def thread_it(self, func_to_execute):
+    def connect_measurement_signals(self, worker):
+        # 'data_ready' is connected first, so the datapoint is stored before its raw log line is created
+        worker.signals.data_ready.connect(self.process_current_datapoint)
+        worker.signals.progress.connect(self.create_raw_log_line)
+
+    def create_worker(self, func_to_execute, *args, **kwargs):
         # Pass the function to execute
-        worker = Worker(func_to_execute) # Any other args, kwargs are passed to the run function
-        worker.signals.result.connect(self.print_output)
-        worker.signals.finished.connect(self.thread_complete)
+        worker = Worker(func_to_execute, *args, **kwargs) # Any other args, kwargs are passed to the run function
+        if logger.isEnabledFor(logging.DEBUG): # both slots only log, skip the signal dispatch otherwise
+            worker.signals.result.connect(self.print_output)
+            worker.signals.finished.connect(self.thread_complete)
+
+        wire = self.thread_signal_wirers.get(getattr(func_to_execute, "__func__", func_to_execute))
+        if wire is not None:
+            wire(worker)
+
+        return worker
 
-        if func_to_execute == self.mpositioner.movetostart:
-            worker.signals.progress.connect(self.create_raw_log_line)
+    def thread_it(self, func_to_execute, *args, **kwargs):
+        worker = self.create_worker(func_to_execute, *args, **kwargs)
 
         # Execute
         self.threadpool.start(worker)
 
         return worker
 
+    def start_motor_job(self, func_to_execute, *args, **kwargs):
+        '''Runs a motor move (or the scan) like 'thread_it()', unless another one is still running.
+        Returns the worker, or None when the motor is busy.'''
+        if not self.motor_busy.acquire(blocking=False):
+            logger.warning("The motor is busy, '%s' was not started", func_to_execute.__name__)
+            return None
+        try:
+            worker = self.create_worker(func_to_execute, *args, **kwargs)
+            # Connected before the start, so that even a job finishing at once releases the motor
+            worker.signals.finished.connect(self.motor_busy.release)
+        except:
+            self.motor_busy.release()
+            raise
+        self.threadpool.start(worker)
+        return worker
+
 # DIALOG BOXES
     def showdialog(self, msg_type:str, message:str):
         '''
         Message type (msg_type) is one of these: 'Error', 'Warning', 'Info'
         '''
         args = (msg_type, message)
-        match msg_type:
-            case "Error":
-                button = QMessageBox.critical(self, *args)
-            case "Warning":
-                button = QMessageBox.warning(self, *args)
-            case "Info":
-                button = QMessageBox.information(self, *args)
+        button = MESSAGE_BOXES[msg_type](self, *args)
         
         #if button == QMessageBox.Ok:
         #    pass
@@ -2257,14 +2305,16 @@ class Integration():
         self.ir = integration_steps
         
         self.stype = stype
+        self.geometry_key = None # (w0, d0, z) of the beam geometry arrays computed last, see 'derive()'
         self.derive(self.DPhi0, self.w0, self.d0, self.ra, stype)
     
     def derive(self, DPhi0, w0, d0, ra, stype):
         '''1st method called. Called on __init__'''
-        # Beam properties
-        self.k = 2*np.pi/self.lda # wave vector in free space
-        self.z0 = 0.5*self.k*w0**2 # diffraction length of the beam
-        self.wa = w0*np.sqrt(1+d0**2/self.z0**2) # beam radius at the aperture plane
+        # Beam geometry depends only on w0, d0 and z; fits often vary just DPhi0 (or the zero level), so it is reused then
+        geometry_key = (w0, d0, self.z.tobytes())
+        if geometry_key != self.geometry_key:
+            self.geometry(w0, d0)
+            self.geometry_key = geometry_key
 
         # Aperture radius
         self.ra = ra
@@ -2272,6 +2322,19 @@ class Integration():
         # Sample properties
         self.Dphi0 = DPhi0/(1+self.z**2/self.z0**2)
 
+        match stype:
+            case "CA":
+                self.bigproduct()
+            case "OA":
+                self.calculate_Tz_for_OA(window.solventOA_absorptionModel_comboBox.currentText()) # CZYŻBY????????
+
+    def geometry(self, w0, d0):
+        '''Called by derive() when the beam waist, aperture distance or positions change.'''
+        # Beam properties
+        self.k = 2*np.pi/self.lda # wave vector in free space
+        self.z0 = 0.5*self.k*w0**2 # diffraction length of the beam
+        self.wa = w0*np.sqrt(1+d0**2/self.z0**2) # beam radius at the aperture plane
+
         # Additional derived parameters
         self.wz = w0*np.sqrt(1+self.z**2/self.z0**2)
 
@@ -2279,11 +2342,17 @@ class Integration():
         self.d = d0-self.z
         self.g = 1+self.d/self.Rz
 
-        match stype:
-            case "CA":
-                self.bigproduct()
-            case "OA":
-                self.calculate_Tz_for_OA(window.solventOA_absorptionModel_comboBox.currentText()) # CZYŻBY????????
+        # Gaussian components: rows are m (from 0 to mm-1), columns are z positions
+        m = np.arange(self.mm)[:,None]
+        self.wm0 = self.wz/np.sqrt((2*m+1))
+        self.dm = 0.5*self.k*self.wm0**2
+        self.wm = self.wm0*np.sqrt(self.g**2+self.d**2/self.dm**2)
+        self.tm = np.arctan(self.g/(self.d/self.dm))
+        self.Rm = self.d/(1-self.g/(self.g**2+self.d**2/self.dm**2))
+
+        # Parts of the field that don't depend on fm (the same for open() and closed())
+        self.component_scale = np.exp(1j*self.tm)*self.wm0/self.wm/self.wz
+        self.component_exponent = -1/self.wm**2+1j*np.pi/self.lda/self.Rm
         
     def calculate_Tz_for_OA(self, model):
         '''2nd method called. Called by derive() for stype = "OA".'''
@@ -2355,7 +2424,13 @@ class Integration():
 
     def calculate_fm(self):
         '''3rd method called. Called by bigproduct()'''
-        self.result = [(1j*self.Dphi0)**m/factorial(m)*self.product[m] for m in range(0,self.mm)]
+        # (1j*Dphi0)**m/m! is built from the previous term, one multiplication per m
+        term = np.ones_like(self.Dphi0, dtype=complex)
+        self.result = []
+        for m in range(0,self.mm):
+            if m > 0:
+                term = term*1j*self.Dphi0/m
+            self.result.append(term*self.product[m])
         return self.result
 
     def bigproduct(self):
@@ -2365,14 +2440,9 @@ class Integration():
         # self.product = np.ones(self.mm) # The result is already known. Uses numpy array for calculate_fm function to work properly
 
         #else: # THIS MUST BE CALCULATED TO TAKE INTO ACCOUNT TRANSMITTANCE THROUGH THE APERTURE
-        self.product = []
-        for m in range(0,self.mm):
-            if m==0:
-                self.product.append(1)
-                continue # 0th value of m gives product=1 and in cumulative product it gives no contribution, so go to next iteration straight away.
-            else:
-                self.product.append(np.cumprod([1+1j*(j-1/2)/2/np.pi*self.T for j in range(1,m+1)])[-1]) # calculate cumulative product for given m
-        #                                                                                                                          # and make 'product' contain all m products
+        # 0th value of m gives product=1, each next m multiplies the previous product by one more factor (j=m)
+        factors = 1+1j*(np.arange(1,self.mm)-1/2)/2/np.pi*self.T
+        self.product = np.concatenate(([1], np.cumprod(factors))) # 'product' contains all m products
         self.fm = self.calculate_fm()
 
         Tzo = self.open() # Returns final result for OA
@@ -2397,22 +2467,13 @@ class Integration():
         # Big sum operator (m from 0 to "infinity")
         # integration over radius
         
-        # Transmitted power
-        self.Tz = 0
-
-        for rr in range(self.ir):
-            self.E = 0
-            
-            for m in range(0,self.mm):
-                self.wm0 = self.wz/np.sqrt((2*m+1))
-                self.dm = 0.5*self.k*self.wm0**2
-                self.wm = self.wm0*np.sqrt(self.g**2+self.d**2/self.dm**2)
-                self.tm = np.arctan(self.g/(self.d/self.dm))
-                self.Rm = self.d/(1-self.g/(self.g**2+self.d**2/self.dm**2))
+        # Gaussian components come from 'geometry()', only their weights fm change with DPhi0
+        amplitude = np.asarray(self.fm)*self.component_scale
+        exponent = self.component_exponent
 
-                self.E += self.fm[m]*np.exp(1j*self.tm)*self.wm0/self.wm/self.wz*np.exp((-1/self.wm**2+1j*np.pi/self.lda/self.Rm)*(rr*self.dr)**2)
-        
-            self.Tz += np.abs(self.E)**2*rr*self.dr # transmittance through aperture plane
+        # Transmitted power: field summed over m at every radius, integrated over radius (compiled when numba is installed)
+        r = np.arange(self.ir)*self.dr
+        self.Tz = transmitted_power(amplitude, exponent, r) # transmittance through aperture plane
         
         # T(z)=P_T/(S*P_i), where S=1-exp(-2*ra^2/wa^2)
         #S = 1-np.exp(-2*self.ra**2/self.wa**2)
@@ -2433,6 +2494,9 @@ class Fitting():
         self.centerpoint = centerpoint
         self.nop = nop
         self.ydata = data
+        # Aperture geometry as read from 'General Parameters' by the caller, so evaluations of the model don't re-read the GUI
+        self.d0 = window.d0
+        self.ra = window.ra
 
     # The parametrized function to be plotted. It is also initial guess for automatic fitting.
     def manual(self, zero_level, centerpoint, amplitude, beamwaist, z_range, stype="CA") -> list:
@@ -2440,15 +2504,14 @@ class Fitting():
         
         ONLY FOR n2 FOR NOW!!!!!!!!!!!!!'''
         self.z_range = z_range # in meters
-        self.sample_type.z = np.array([self.z_range*(zz - centerpoint)/self.nop-self.z_range/2 for zz in range(self.nop)]) # in meters
-        window.get_general_parameters()
+        self.sample_type.z = self.z_range*(np.arange(self.nop) - centerpoint)/self.nop-self.z_range/2 # in meters
         if stype == "CA":
-            self.sample_type.derive(amplitude,beamwaist,window.d0,window.ra,stype)
+            self.sample_type.derive(amplitude,beamwaist,self.d0,self.ra,stype)
             cas = self.sample_type.closed_sum # Tznorm
             oas = self.sample_type.open_sum   # Tznorm
             result = (cas/oas)+(zero_level-1)
         elif stype == "OA":
-            self.sample_type.derive(amplitude,beamwaist,window.d0,window.ra,stype)
+            self.sample_type.derive(amplitude,beamwaist,self.d0,self.ra,stype)
             oas = self.sample_type.Tznorm
             result = oas+(zero_level-1)
         
@@ -2460,6 +2523,16 @@ class Fitting():
         ynew = self.manual(*pars)
         return [w*((yn-yi)**2) for w,yn,yi in zip(weights,ynew,self.ydata)] # SSE
 
+    def weights_from_cursors(self, xs, cursor_positions):
+        '''Returns fit weights: 1 for the datapoints between the two cursors (nearest points included), 0 elsewhere.'''
+        xs = np.asarray(xs)
+        x1_index, x2_index = (int(np.abs(xs-x).argmin()) for x, _ in cursor_positions)
+        x_sm, x_lg = sorted([x1_index, x2_index])
+        
+        weights = np.zeros(len(xs))
+        weights[x_sm:x_lg+1] = 1
+        return weights
+
     # The actual processor for automatic fitting
     def automatic(self, z_range, ftype:str, stype:str, line_xydata):
         self.z_range = z_range
@@ -2500,17 +2573,7 @@ class Fitting():
             if hasattr(window, 'silicaCA_cursorPositions'):
                 if len(window.silicaCA_cursorPositions) == 2:
                     # CA ranges for weighting the fit
-                    x1 = window.silicaCA_cursorPositions[0][0]
-                    x1_index = list(xs).index(min(xs, key=lambda x:abs(x-x1)))
-                    y1 = window.silicaCA_cursorPositions[0][1]
-                    #y1_index = list(ys).index(min(ys, key=lambda x:abs(x-y1)))
-                    x2 = window.silicaCA_cursorPositions[1][0]
-                    x2_index = list(xs).index(min(xs, key=lambda x:abs(x-x2)))
-                    y2 = window.silicaCA_cursorPositions[1][1]
-                    #y2_index = list(ys).index(min(ys, key=lambda x:abs(x-y2)))
-                    
-                    x_sm, x_lg = sorted([x1_index, x2_index])
-                    weights = [0 if (xi < x_sm or xi > x_lg) else 1 for xi in range(len(xs))]
+                    weights = self.weights_from_cursors(xs, window.silicaCA_cursorPositions)
             
             fitter = Minimizer(self.fcn2min,self.params,fcn_args=(weights))
 
@@ -2532,17 +2595,7 @@ class Fitting():
 
                 if len(attribute) == 2:
                     # CA ranges for weighting the fit
-                    x1 = attribute[0][0]
-                    x1_index = list(xs).index(min(xs, key=lambda x:abs(x-x1)))
-                    y1 = attribute[0][1]
-                    y1_index = list(ys).index(min(ys, key=lambda x:abs(x-y1)))
-                    x2 = attribute[1][0]
-                    x2_index = list(xs).index(min(xs, key=lambda x:abs(x-x2)))
-                    y2 = attribute[1][1]
-                    y2_index = list(ys).index(min(ys, key=lambda x:abs(x-y2)))
-                    
-                    x_sm, x_lg = sorted([x1_index, x2_index])
-                    weights = [0 if (xi < x_sm or xi > x_lg) else 1 for xi in range(len(xs))]
+                    weights = self.weights_from_cursors(xs, attribute)
             
             fitter = Minimizer(self.fcn2min,self.params,fcn_args=(weights))
         
@@ -2551,44 +2604,48 @@ class Fitting():
         res_pars = result.params.valuesdict().values()
         result_line = self.manual(*res_pars, stype) # this will have to catch two lines (n2 and OA)
 
-        result.params.pretty_print()
+        if logger.isEnabledFor(logging.DEBUG): # pretty_print writes a whole table to stdout
+            result.params.pretty_print()
 
         return result, result_line
 
 class MotorPositioner(QObject):
-    def movetostart(self, progress_callback):
-        start_pos = window.startPos_doubleSpinBox.value()
-        end_pos = window.endPos_doubleSpinBox.value()
+    def __init__(self):
+        super(MotorPositioner, self).__init__()
+        self.stop_requested = threading.Event() # set by 'stop_experiment()', ends the waits of a motor job at once
+        # Acquired for every datapoint emitted by 'run()', released by 'Window.process_current_datapoint()'
+        self.display_slots = threading.BoundedSemaphore(MAX_PENDING_DATAPOINTS)
+
+    def movetostart(self, progress_callback, data_ready_callback, start_pos, end_pos, number_of_steps, stepsize):
+        self.stop_requested.clear()
         if window.motor.position <= (start_pos+end_pos)/2:
-            window.motor.move_to(start_pos)
             window.where_to_start = "start"
+            target = start_pos
         else:
-            window.motor.move_to(end_pos)
             window.where_to_start = "end"
+            target = end_pos
         
-        if window.motor.is_in_motion == True:
-            print("Moving to starting position")
-        
-        while window.motor.is_in_motion == True:
-            continue
+        logger.debug("Moving to starting position")
+        # The APT library waits for the move-complete event itself, no busy polling of 'is_in_motion'
+        window.motor.move_to(target, blocking=True)
 
-        self.run(progress_callback)
+        self.run(progress_callback, data_ready_callback, number_of_steps, stepsize)
     
     def movetocustompos(self, *args, **kwargs):
+        self.stop_requested.clear()
         text_val = window.custom_pos_dialog.new_pos.text()
         target = float(text_val.replace(",","."))
 
         if target > 100:
             return
 
-        window.motor.move_to(target)
-        while window.motor.is_in_motion == True:
-            continue
+        window.motor.move_to(target, blocking=True)
 
         window.current_pos_chooser.setEnabled(True)
 
-    def moveby(self, *args, **kwargs):
-        move_step = (window.endPos_doubleSpinBox.value()-window.startPos_doubleSpinBox.value())/window.stepsScan_spinBox.value()
+    def moveby(self, move_step, *args, **kwargs):
+        if self.stop_requested.is_set():
+            return
         if window.where_to_start == "end":
             window.motor.move_by(-move_step,blocking=True)
         else:
@@ -2598,101 +2655,124 @@ class MotorPositioner(QObject):
         #    continue
     
     def movehome(self, *args, **kwargs):
+        self.stop_requested.clear()
         if window.motor.has_homing_been_completed == False:
             window.motor.move_home()
          
             time.sleep(0.2) # otherwise it may not move_home()
             if window.motor.is_in_motion == True:
-                print("Homing now")
+                logger.debug("Homing now")
             while window.motor.has_homing_been_completed == False:
-                continue # wait until homing is completed
+                # wait until homing is completed, without spinning the CPU (returns True on stop)
+                if self.stop_requested.wait(HOMING_POLL_INTERVAL):
+                    return "Homing stopped!"
             time.sleep(0.2) # wait a little more (so the motor.position gets exactly "0" position)
         
         return "Homing performed!"
 
-    def run(self, progress_callback):
+    def wait_for_samples(self, samples_acquired:threading.Event):
+        '''Waits up to ACQUISITION_TIMEOUT for the samples of one step.
+        Returns False when the experiment is stopped or the samples don't come in time.'''
+        deadline = time.monotonic()+ACQUISITION_TIMEOUT
+        while not samples_acquired.wait(ACQUISITION_POLL_INTERVAL):
+            if self.stop_requested.is_set():
+                return False
+            if time.monotonic() >= deadline:
+                logger.warning("No samples acquired within %s s, the scan is stopped", ACQUISITION_TIMEOUT)
+                return False
+        return True
+
+    def wait_for_display_slot(self):
+        '''Waits until the GUI has stored enough of the emitted datapoints to accept another one.
+        Returns False when the experiment is stopped meanwhile.'''
+        while not self.display_slots.acquire(timeout=ACQUISITION_POLL_INTERVAL):
+            if self.stop_requested.is_set() or window.experiment_stopped == True:
+                return False
+        return True
+
+    def run(self, progress_callback, data_ready_callback, number_of_steps, stepsize):
         window.data_acquisition_complete = False
         window.data_reversed = False # when backwards scan is performed, it later gets reversed (the data_reverse() method)
 
-        time.sleep(0.2) # Sometimes the first datapoint is collected before the motor has settled
+        self.stop_requested.wait(0.2) # Sometimes the first datapoint is collected before the motor has settled (returns early on stop)
 
-        nos = window.stepsScan_spinBox.value()
+        nos = number_of_steps
+        # Task configuration is the same at every step, read it once per scan
+        channels = window.detector_core_name+f"0:{window.number_of_channels_used}" # "Dev1/ai0:3"
+        samples_per_step = window.samplesStep_spinBox.value()
+        rate0 = 1000 # 1 kHz (repetition rate of the laser)
 
-        for step in range(nos+1):
-            if window.experiment_stopped == True:
-                window.experiment_stopped = False
-                window.running = False
-                break
-            self.step = step
-            ### Create a task
-            with nidaqmx.Task() as task:
-                # Create MultiChannel "channel"
-                task.ai_channels.add_ai_voltage_chan(window.detector_core_name+f"0:{window.number_of_channels_used}") # "Dev1/ai0:3"
-                
-                # Start Digital Edge
-                task.triggers.start_trigger.dig_edge_src = "/Dev1/PFI0"
-                task_trigger_src = task.triggers.start_trigger.dig_edge_src
+        ### Create a task, configured once and restarted at every step
+        with nidaqmx.Task() as task:
+            # Create MultiChannel "channel"
+            task.ai_channels.add_ai_voltage_chan(channels)
+            
+            # Start Digital Edge
+            task.triggers.start_trigger.dig_edge_src = "/Dev1/PFI0"
+            task_trigger_src = task.triggers.start_trigger.dig_edge_src
 
-                # Sample Clock
-                rate0 = 1000 # 1 kHz (repetition rate of the laser)
-                task.timing.cfg_samp_clk_timing(rate0,source=task_trigger_src,active_edge=Edge.FALLING, sample_mode=AcquisitionType.FINITE, samps_per_chan=window.samplesStep_spinBox.value())
+            # Sample Clock
+            task.timing.cfg_samp_clk_timing(rate0,source=task_trigger_src,active_edge=Edge.FALLING, sample_mode=AcquisitionType.FINITE, samps_per_chan=samples_per_step)
+            
+            reader = nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream)
+            values_read = np.empty((window.number_of_channels_used+1,samples_per_step),dtype=np.float64) # overwritten by every read
+            
+            # The driver calls back as soon as all samples of a step are in the buffer
+            samples_acquired = threading.Event()
+            def on_samples_acquired(task_handle, every_n_samples_event_type, number_of_samples, callback_data):
+                samples_acquired.set()
+                return 0
+            task.register_every_n_samples_acquired_into_buffer_event(samples_per_step, on_samples_acquired)
+
+            for step in range(nos+1):
+                if window.experiment_stopped == True or self.stop_requested.is_set():
+                    break
+                self.step = step
                 
                 ### Data acquisition
-                reader = nidaqmx.stream_readers.AnalogMultiChannelReader(task.in_stream)
-                values_read = np.zeros((window.number_of_channels_used+1,window.samplesStep_spinBox.value()),dtype=np.float64)
                 # Start Task
+                samples_acquired.clear()
                 task.start()
-                
-                time.sleep(0.2) # THIS IS THE TIME NEEDED TO COLLECT ALL SAMPLES
 
                 # Acquire data
-                window.data["positions"].append(window.motor.position)
-                reader.read_many_sample(values_read, number_of_samples_per_channel=window.samplesStep_spinBox.value())
+                position = window.motor.position
+                if not self.wait_for_samples(samples_acquired):
+                    break
+                reader.read_many_sample(values_read, number_of_samples_per_channel=samples_per_step)
                 
-                # Take mean for each channel and append to "data" dictionary
+                # Take mean for each channel (a new small array, the GUI may still hold the previous ones)
                 data_mean = np.mean(values_read,axis=1)
 
-                for chan_no in range(window.number_of_channels_used):
-                    window.data["absolute"][chan_no].append(data_mean[chan_no])
-                # These loops need to be separated because "absolute" list at current step MUST BE defined at current step when accessed by "relative" list
-                for chan_no in range(window.number_of_channels_used):
-                    # Take last/current value (at index [step]) in "absolute" values list and divide by channel [1] (reference)
-                    # And append to "relative" values list
-                    window.data["relative"][chan_no].append(data_mean[chan_no]/window.data["absolute"][1][step])
-                
-                # 2) display data
-                
-                for type in window.charts.keys():
-                    for chan_no in range(window.number_of_channels_used):
-                        window.measurement_lines[type][chan_no].set_xdata(window.data["positions"]) # and set data of lines in "lines" dictionary to empty lists of positions and values
-                        window.measurement_lines[type][chan_no].set_ydata(window.data[type][chan_no])
-
-                y = window.data["absolute"][1]
-                window.rms_value = np.abs(np.sqrt(np.mean([yi**2 for yi in y])) - y[0])/y[0]
-                window.rms_text.set_text(f"RMS noise = {window.rms_value*100:.3f}%")
-                
-                window.measurement_plot_rescale(window.focusAt_comboBox.currentText())
+                # 2) store and display data (in the GUI thread, see 'process_current_datapoint()')
+                # The motor moves on while the GUI draws; if it falls MAX_PENDING_DATAPOINTS behind, wait for it
+                if not self.wait_for_display_slot():
+                    break
+                # The ndarray is passed by reference through the 'object' signal, no per-value conversion
+                data_ready_callback.emit((step, position, data_mean))
 
                 progress_callback.emit(step)
 
                 # 3) move the motor
                 if step == nos: # prevent useless additional step
-                    window.data_acquisition_complete = True
                     break
                 else:
-                    window.mpositioner.moveby()
+                    self.moveby(stepsize)
                 
-                task.stop()
+                task.stop() # channels, trigger and timing stay configured for the next step
+        
+        # EMIT SOUND AT FINISH (in its own thread, Beep() blocks for the whole sound)
+        threading.Thread(target=self.beep, daemon=True).start()
         
-        # EMIT SOUND AT FINISH
+        window.experiment_stopped = False
+        window.running = False
+
+    def beep(self):
         duration = 500  # milliseconds
         freq = 800  # Hz
         for _ in range(3):
             winsound.Beep(freq, duration)
             time.sleep(0.05)
         
-        window.running = False
-        
 if __name__ == '__main__':
     app = QtWidgets.QApplication(sys.argv)
     